@@ -1,131 +1,552 @@
-import copy
+import heapq
+import time
+from collections import deque
+
+
+class NodeSlots:
+    """
+    Give each node a stable index in the DV tables. The index of a removed
+    node is reused by the next node added, and the capacity doubles when
+    every index is taken so the tables only grow once in a while.
+    """
+    def __init__(self):
+        self.nodes = [] # Node at each index, None for a free index
+        self.free_indices = [] # Heap of free indices below the capacity
+
+    def capacity(self):
+        return len(self.nodes)
+
+    def reserve(self, capacity):
+        """
+        Make room for the given number of nodes
+        :param capacity: the minimum capacity
+        """
+        for index in range(len(self.nodes), capacity):
+            self.nodes.append(None)
+            heapq.heappush(self.free_indices, index)
+
+    def add(self, node, index=None):
+        """
+        Give the lowest free index to the node, or the given one
+        :param node: the node object
+        :param index: the index of the node, the lowest free one by default
+        :return: the index of the node
+        :raise ValueError: if the index is taken
+        """
+        if index is None:
+            # The indices given explicitly are left in the heap, skip them
+            while self.free_indices and self.nodes[self.free_indices[0]] is not None:
+                heapq.heappop(self.free_indices)
+            if not self.free_indices:
+                self.reserve(max(1, 2 * len(self.nodes)))
+            index = heapq.heappop(self.free_indices)
+        else:
+            self.reserve(index + 1)
+            if self.nodes[index] is not None:
+                raise ValueError("Index {} is taken".format(index))
+        self.nodes[index] = node
+        node.node_index = index
+        return index
+
+    def remove(self, node):
+        index = node.node_index
+        self.nodes[index] = None
+        heapq.heappush(self.free_indices, index)
+
+    def get(self, index):
+        return self.nodes[index]
+
+    def trim(self):
+        """
+        Drop the free indices after the last used one
+        """
+        while self.nodes and self.nodes[-1] is None:
+            self.nodes.pop()
+        self.free_indices = sorted({i for i in self.free_indices
+                                    if i < len(self.nodes) and self.nodes[i] is None})
+
+    def reset(self):
+        self.nodes = []
+        self.free_indices = []
 
 
 class DVR:
     """
     This class handle the operation of the DVR algorithm
     """
+    # Cost advertised back to the neighbor a route is learned from
+    POISON_COST = 999999
+
     def __init__(self, node):
         self.node = node
         self.graph = node.graph
         self.node_list = self.graph.node_list
         self.neigbor_index = [] # List of neighbor index
         self.node_table = [] # The DV table
-        self.temp_table = []
+        # Row shared by the nodes which are not neighbors, never modified
+        self.empty_row = []
         self.is_initialized = False
         self.is_converged = False
         self.node_index = self.node.node_index
         # List that keep track which interface the cost to
         #  a node is learn from
         self.learn_table = []
+        # Destinations whose cost or interface changed in the last round
+        self.changed_destinations = set()
+        # Destinations changed by a neighbor since the last computation,
+        # only those are recomputed
+        self.dirty_destinations = set()
+        # Destination -> (cost, interface) computed but not committed yet
+        self.pending_updates = {}
+        # True when the copy of a neighbor vector changed in the last round
+        self.is_neighbor_changed = False
+        # Destination -> number of commits in a row its cost increased
+        self.growth_streak = {}
+        # True when every destination has to be recomputed, e.g. after a
+        # link was added, removed or had its cost changed
+        self.recompute_all = True
 
     def update_neighbor_index(self):
         """
         Update the index of neighbor nodes
         :return:
         """
-        self.neigbor_index.clear()
+        old_index = self.neigbor_index
+        self.neigbor_index = []
         for node in self.node.neighbor_nodes:
             node_index = node.node_index
             self.neigbor_index.append(node_index)
+        # Forget the vectors of the nodes which are not neighbors anymore
+        for node_index in set(old_index).difference(self.neigbor_index):
+            if node_index < len(self.node_table) and node_index != self.node_index:
+                self.node_table[node_index] = self.empty_row
+
+    def mark_dirty(self):
+        """
+        Recompute every destination in the next round, must be called
+        when a link of the node is added, removed or changes cost
+        """
+        self.recompute_all = True
 
     def initialize_node_table(self):
         """
         Ininitalize the DV table for the node
         """
         self.node_index = self.node.node_index
-        self.node_table = []
-        for i, node_i in enumerate(self.node_list):
-            self.node_table.append([])
-            self.learn_table.append(0)
-            for j, node_j in enumerate(self.node_list):
-                if node_i == self.node:
-                    self.node_table[i].append(node_i.get_edge_cost_between(node_j))
-                else:
-                    self.node_table[i].append(None)
+        num_node = self.graph.node_slots.capacity()
+        self.empty_row = [None] * num_node
+        self.node_table = [self.empty_row] * num_node
+        self.learn_table = [0] * num_node
+        own_DV = [None] * num_node
+        own_DV[self.node_index] = 0
+        self.neigbor_index = []
         self.update_neighbor_index()
+        for node in self.node.neighbor_nodes:
+            own_DV[node.node_index] = self.node.get_edge_cost_between(node)
+        self.node_table[self.node_index] = own_DV
         self.learn_table[self.node_index] = self.node_index
         for index in self.neigbor_index:
             self.learn_table[index] = index
         self.is_initialized = True
-        self.update_neighbor_index()
+        # The destinations the node announces first: itself and its neighbors
+        self.changed_destinations = {i for i, value in enumerate(own_DV) if value is not None}
+        self.pending_updates = {}
+        self.growth_streak = {}
+        self.recompute_all = True
+
+    def resize(self, capacity):
+        """
+        Extend the tables to the new capacity of the node slots, the new
+        destinations are unreachable until they are advertised
+        :param capacity: the new number of entries
+        """
+        extra = capacity - len(self.node_table)
+        if extra <= 0:
+            return
+        old_empty_row = self.empty_row
+        self.empty_row = [None] * capacity
+        self.node_table = [self.empty_row if row is old_empty_row else row
+                           for row in self.node_table]
+        self.node_table.extend([self.empty_row] * extra)
+        self.node_table[self.node_index] = self.node_table[self.node_index] + [None] * extra
+        self.learn_table = self.learn_table + [None] * extra
 
-    def calculate_distance_vector(self):
+    def forget_destinations(self, indices):
+        """
+        Remove the routes to nodes which left the network or cannot be
+        reached anymore
+        :param indices: the indices of the destinations
+        :return: the number of routes removed
+        """
+        own_DV = self.node_table[self.node_index]
+        indices = [i for i in indices if i < len(own_DV)]
+        removed = [i for i in indices
+                   if own_DV[i] is not None or self.learn_table[i] is not None]
+        if removed:
+            own_DV = list(own_DV)
+            learn_table = list(self.learn_table)
+            for i in removed:
+                own_DV[i] = None
+                learn_table[i] = None
+            self.node_table[self.node_index] = own_DV
+            self.learn_table = learn_table
+        for i in indices:
+            if i != self.node_index and i not in self.neigbor_index:
+                self.node_table[i] = self.empty_row
+            self.changed_destinations.discard(i)
+            self.dirty_destinations.discard(i)
+            self.pending_updates.pop(i, None)
+            self.growth_streak.pop(i, None)
+        return len(removed)
+
+    def calculate_distance_vector(self, infinity_cost=None):
+        """
+        Compute the new distance vector with the Bellman-Ford equation.
+        Only the destinations changed by a neighbor in the last round are
+        recomputed, the other entries are kept as they are.
+        :param infinity_cost: the cost from which a destination is unreachable
+        :return: True if the distance vector changed
+        """
+        self.pending_updates = {}
         if not self.is_initialized:
             print("The node table must be initialized first")
             return
-        self.update_neighbor_index()
-        self.temp_table = copy.deepcopy(self.node_table)
+        neighbor_nodes = self.node.neighbor_nodes
+        destinations = self.dirty_destinations
+        self.dirty_destinations = set()
+        # A full recomputation also refreshes the copies of the neighbor vectors
+        self.is_neighbor_changed = bool(destinations) or self.recompute_all
+        if self.recompute_all:
+            self.update_neighbor_index()
+            destinations = range(len(self.node_table[self.node_index]))
+        elif not destinations:
+            return False
 
-        # Loop through neighbor nodes
-        temp_DV = []
-        temp_index_DV = []
-        for i in range(len(self.node_table)):
-            temp_DV.append([])
-            temp_index_DV.append([])
-
-        for node in self.node_list:
+        # Get and save neighbor v’s distance vector, in index order so that
+        # ties are broken the same way in every round
+        neighbors = []
+        for node in sorted(neighbor_nodes, key=lambda node: node.node_index):
             node_index = node.node_index
-            if node in self.node.neighbor_nodes:
-                cost_between = self.node.get_edge_cost_between(node)
-                # Get and save neighbor v’s distance vector
-                DV_node = node.dvr.node_table[node_index]
-                self.node_table[node_index] = DV_node
-
-                # uses the Bellman-Ford equation to update its own distance vector
-                for i in range(len(self.temp_table[self.node_index])):
-                    if i is self.node_index:
-                        temp_DV[i].append(0)
-                        temp_index_DV[i].append(i)
-                    elif DV_node[i] is None:
+            DV_node = node.dvr.node_table[node_index]
+            self.node_table[node_index] = DV_node
+            neighbors.append((node_index, DV_node, node.dvr.learn_table,
+                              self.node.get_edge_cost_between(node)))
+
+        own_DV = self.node_table[self.node_index]
+        for i in destinations:
+            if i == self.node_index:
+                min_value, node_index = 0, i
+            else:
+                min_value, node_index = None, None
+                for neighbor_index, DV_node, learn_table, cost_between in neighbors:
+                    if DV_node[i] is None:
                         continue
-                    elif node.dvr.learn_table[i] == self.node_index:
-                        temp_DV[i].append(999999 + cost_between)
-                        temp_index_DV[i].append(node_index)
+                    elif learn_table[i] == self.node_index:
+                        value = self.POISON_COST + cost_between
                     else:
-                        temp_DV[i].append(DV_node[i] + cost_between)
-                        temp_index_DV[i].append(node_index)
-            elif node != self.node:
-                DV_node = [None for i in range(len(self.node_list))]
-                print("AA", self.node.node_index)
-                print("node", node_index)
-                self.node_table[node_index] = DV_node
-
-
-        for i, dv in enumerate(self.temp_table[self.node_index]):
-            min_value, node_index = self.compute_min(temp_DV[i], temp_index_DV[i])
-            self.temp_table[self.node_index][i] = min_value
-            self.learn_table[i] = node_index
+                        value = DV_node[i] + cost_between
+                    if min_value is None or value < min_value:
+                        min_value, node_index = value, neighbor_index
+                if infinity_cost is not None and min_value is not None \
+                        and min_value >= infinity_cost:
+                    min_value, node_index = None, None
+            if min_value != own_DV[i] or node_index != self.learn_table[i]:
+                self.pending_updates[i] = (min_value, node_index)
         return self.is_DV_changed()
 
-    def compute_min(self, a_list, index_list):
-        """
-        Compute the min value of path's cost and the index of the interface
-        :param a_list: the list holds the value
-        :param index_list: the list holds the index position
-        :return: the min value and the node index of the interface
-        """
-        try:
-            min_value = min(a_list)
-            index = a_list.index(min_value)
-            node_index = index_list[index]
-            return min_value, node_index
-        except:
-            return None, None
-
-
     def update_distance_vector(self):
         """
-        update the distance vector
+        update the distance vector, the old lists are replaced and never
+        modified so a list read by another object stays consistent
         """
-        self.node_table[self.node_index] = self.temp_table[self.node_index]
+        self.recompute_all = False
+        self.changed_destinations = set(self.pending_updates)
+        if not self.pending_updates:
+            return
+        own_DV = list(self.node_table[self.node_index])
+        learn_table = list(self.learn_table)
+        for i, (min_value, node_index) in self.pending_updates.items():
+            if own_DV[i] is not None and min_value is not None and min_value > own_DV[i]:
+                self.growth_streak[i] = self.growth_streak.get(i, 0) + 1
+            elif self.growth_streak:
+                self.growth_streak.pop(i, None)
+            own_DV[i] = min_value
+            learn_table[i] = node_index
+        self.node_table[self.node_index] = own_DV
+        self.learn_table = learn_table
+        self.pending_updates = {}
+        for node in self.node.neighbor_nodes:
+            node.dvr.dirty_destinations.update(self.changed_destinations)
 
     def is_DV_changed(self):
         """
-        check whether the Distance Vector has changed
+        check whether the DV table has changed, either the own distance
+        vector or the copy of a neighbor distance vector
         """
-        for i, row in enumerate(self.node_table):
-            for j, entry in enumerate(self.node_table[i]):
-                if entry != self.temp_table[i][j]:
-                    return True
-        return False
+        return bool(self.pending_updates) or self.is_neighbor_changed
+
+
+# Update modes of a round
+JACOBI = "jacobi"
+GAUSS_SEIDEL = "gauss-seidel"
+# Orders of the nodes in a Gauss-Seidel round
+ORDER_INDEX = "index"
+ORDER_BFS = "bfs"
+ORDER_DEGREE = "degree"
+
+
+def order_nodes(node_list, order):
+    """
+    Sort the nodes for a Gauss-Seidel round
+    :param node_list: the list of nodes
+    :param order: ORDER_INDEX for the node index order, ORDER_BFS for a
+        breadth first search from the nodes changed in the last round,
+        ORDER_DEGREE for the nodes with the most neighbors first
+    :return: the sorted list of nodes
+    """
+    if order == ORDER_INDEX:
+        return sorted(node_list, key=lambda node: node.node_index)
+    if order == ORDER_DEGREE:
+        return sorted(node_list, key=lambda node: (-len(node.neighbor_nodes), node.node_index))
+    if order == ORDER_BFS:
+        ordered = [node for node in node_list if node.dvr.changed_destinations]
+        visited = set(ordered)
+        queue = deque(ordered)
+        while queue:
+            for neighbor in queue.popleft().neighbor_nodes:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    ordered.append(neighbor)
+                    queue.append(neighbor)
+        ordered.extend(node for node in node_list if node not in visited)
+        return ordered
+    raise ValueError("Unknown order: {}".format(order))
+
+
+def is_reversed_round(round_number, order):
+    """
+    Tell whether a Gauss-Seidel round goes through the order backward. The
+    index order is swept back and forth so that news travel fast in both
+    directions, the BFS and degree orders are always followed forward.
+    :param round_number: the number of rounds already run
+    :param order: the order of the nodes, see order_nodes
+    :return: True to reverse the order
+    """
+    return order == ORDER_INDEX and round_number % 2 == 1
+
+
+def step_round(node_list, infinity_cost=None, mode=JACOBI, order=ORDER_INDEX,
+               reverse=False):
+    """
+    Run one round of the DVR algorithm. In JACOBI mode every node computes
+    its new distance vector from the previous round, then all nodes commit.
+    In GAUSS_SEIDEL mode each node commits right away in the given order, so
+    the nodes after it in the round already use its new vector.
+    :param node_list: the list of nodes with initialized DVR objects
+    :param infinity_cost: the cost from which a destination is unreachable
+    :param mode: JACOBI or GAUSS_SEIDEL
+    :param order: the order of the nodes in GAUSS_SEIDEL mode, see order_nodes
+    :param reverse: True to go through the order backward in GAUSS_SEIDEL mode
+    :return: the list of node indices whose distance vector changed
+    """
+    changed_nodes = []
+    if mode == GAUSS_SEIDEL:
+        ordered = order_nodes(node_list, order)
+        if reverse:
+            ordered.reverse()
+        for node in ordered:
+            if node.dvr.calculate_distance_vector(infinity_cost):
+                changed_nodes.append(node.node_index)
+            node.dvr.update_distance_vector()
+        return changed_nodes
+
+    for node in node_list:
+        if node.dvr.calculate_distance_vector(infinity_cost):
+            changed_nodes.append(node.node_index)
+
+    for node in node_list:
+        node.dvr.update_distance_vector()
+    return changed_nodes
+
+
+def join_node(node, index=None):
+    """
+    Add a node to the network. If the simulation is running, the tables of
+    the other nodes are only extended when the slots run out of capacity
+    and the new node starts with its own table.
+    :param node: the node object, its graph holds node_list and node_slots
+    :param index: the index of the node, the lowest free one by default
+    """
+    graph = node.graph
+    node_list = graph.node_list
+    # The nodes are initialized all together and a node joining a running
+    # simulation is initialized right away, so checking one node is enough
+    is_running = bool(node_list) and node_list[0].dvr.is_initialized
+    old_capacity = graph.node_slots.capacity()
+    graph.node_slots.add(node, index)
+    node_list.append(node)
+    capacity = graph.node_slots.capacity()
+    if is_running:
+        if capacity != old_capacity:
+            for other in node_list:
+                if other.dvr.is_initialized:
+                    other.dvr.resize(capacity)
+        node.dvr.initialize_node_table()
+
+
+def leave_node(node):
+    """
+    Remove a node from the network, its links must be removed first.
+    The index of the node is freed and every node forgets the routes to it,
+    the neighbors that lost a link recompute their whole vector.
+    :param node: the node object, its graph holds node_list and node_slots
+    """
+    graph = node.graph
+    graph.node_slots.remove(node)
+    graph.node_list.remove(node)
+    for other in graph.node_list:
+        if other.dvr.is_initialized:
+            other.dvr.forget_destinations([node.node_index])
+    node.dvr.is_initialized = False
+
+
+def compute_infinity_cost(node_list):
+    """
+    Compute a cost no loop free path can reach: the sum of all link costs
+    plus one. A route reaching it can only be counting to infinity.
+    :param node_list: the list of nodes
+    :return: the infinity cost
+    """
+    total = 0
+    for node in node_list:
+        for neighbor in node.neighbor_nodes:
+            total += node.get_edge_cost_between(neighbor)
+    return total // 2 + 1
+
+
+def find_components(node_list):
+    """
+    Label the connected components of the network
+    :param node_list: the list of nodes
+    :return: dictionary node index -> component number
+    """
+    component = {}
+    label = 0
+    for start in node_list:
+        if start.node_index in component:
+            continue
+        label += 1
+        component[start.node_index] = label
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbor in node.neighbor_nodes:
+                if neighbor.node_index not in component:
+                    component[neighbor.node_index] = label
+                    queue.append(neighbor)
+    return component
+
+
+def mark_unreachable(node_list):
+    """
+    Remove the routes to the destinations outside the component of each
+    node, they would otherwise count to infinity
+    :param node_list: the list of nodes with initialized DVR objects
+    :return: the number of routes removed
+    """
+    component = find_components(node_list)
+    if not node_list or max(component.values()) == 1:
+        return 0
+    removed = 0
+    for node in node_list:
+        own_component = component[node.node_index]
+        own_DV = node.dvr.node_table[node.node_index]
+        indices = [i for i, value in enumerate(own_DV)
+                   if value is not None and component.get(i) != own_component]
+        if indices:
+            removed += node.dvr.forget_destinations(indices)
+    return removed
+
+
+class SimulationResult:
+    """
+    Outcome of run_until_stable
+    """
+    CONVERGED = "converged"
+    ROUND_BUDGET = "round budget exhausted"
+    TIME_BUDGET = "time budget exhausted"
+    CANCELLED = "cancelled"
+
+    def __init__(self, rounds, reason, unreachable_routes, elapsed, messages=0,
+                 cpu_time=0.0, num_node=0):
+        self.rounds = rounds
+        self.reason = reason
+        self.is_converged = reason == self.CONVERGED
+        # Number of routes removed because their destination is unreachable
+        self.unreachable_routes = unreachable_routes
+        self.elapsed = elapsed
+        # Number of distance vectors sent to a neighbor
+        self.messages = messages
+        self.cpu_time = cpu_time
+        self.cpu_per_node = cpu_time / num_node if num_node else 0.0
+
+
+def run_until_stable(node_list, max_rounds=None, time_budget=None,
+                     growth_rounds=3, on_round=None, mode=JACOBI, order=ORDER_INDEX,
+                     first_round=0):
+    """
+    Run rounds until the network converges or a budget is exhausted.
+    Routes to destinations in another partition are removed at the start,
+    and again whenever a cost grows for growth_rounds rounds in a row, so
+    a partitioned network does not count to infinity. Costs above the sum
+    of all link costs are treated as unreachable as a last resort.
+    :param node_list: the list of nodes with initialized DVR objects
+    :param max_rounds: the maximum number of rounds, None for no limit
+    :param time_budget: the maximum wall time in seconds, None for no limit
+    :param growth_rounds: rounds of growing cost before checking partitions
+    :param on_round: function called with the changed node indices of each
+        round, the run is cancelled when it returns True
+    :param mode: JACOBI or GAUSS_SEIDEL, see step_round
+    :param order: the order of the nodes in GAUSS_SEIDEL mode
+    :param first_round: the number of rounds already run, so that the
+        schedule of is_reversed_round goes on from the previous rounds
+    :return: the SimulationResult object
+    """
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    infinity_cost = compute_infinity_cost(node_list)
+    unreachable_routes = mark_unreachable(node_list)
+    nodes = {node.node_index: node for node in node_list}
+    # A node sends its vector to every neighbor when it changes, the
+    # vectors of newly initialized nodes are sent before the first round
+    messages = sum(len(node.neighbor_nodes) for node in node_list
+                   if node.dvr.changed_destinations)
+    rounds = 0
+    while True:
+        if max_rounds is not None and rounds >= max_rounds:
+            reason = SimulationResult.ROUND_BUDGET
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            reason = SimulationResult.TIME_BUDGET
+            break
+        changed_nodes = step_round(node_list, infinity_cost, mode, order,
+                                   reverse=is_reversed_round(first_round + rounds, order))
+        rounds += 1
+        for index in changed_nodes:
+            if nodes[index].dvr.changed_destinations:
+                messages += len(nodes[index].neighbor_nodes)
+        is_cancelled = on_round is not None and on_round(changed_nodes)
+        if not changed_nodes:
+            reason = SimulationResult.CONVERGED
+            break
+        if is_cancelled:
+            reason = SimulationResult.CANCELLED
+            break
+        if any(node.dvr.growth_streak and max(node.dvr.growth_streak.values()) >= growth_rounds
+               for node in node_list):
+            unreachable_routes += mark_unreachable(node_list)
+            for node in node_list:
+                node.dvr.growth_streak = {}
+    return SimulationResult(rounds, reason, unreachable_routes,
+                            time.perf_counter() - start, messages,
+                            time.process_time() - cpu_start, len(node_list))
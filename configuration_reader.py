@@ -1,60 +1,395 @@
+import configparser
+import math
+import random
+from array import array
 from configparser import ConfigParser
 
 
-def read_file(filename):
+def new_edge_arrays():
     """
-    read the config file and return the number of
-    nodes and list of edges
+    Create the arrays holding the edges of a topology
+    :return: the source index, target index and cost arrays
+    """
+    return array('l'), array('l'), array('l')
+
+
+def random_costs(rng, num_edge, min_cost=1, max_cost=1):
+    """
+    Draw the cost of each edge
+    :param rng: the random.Random object
+    :param num_edge: the number of edges
+    :param min_cost: the minimum cost of an edge
+    :param max_cost: the maximum cost of an edge
+    :return: array of costs
+    """
+    if min_cost == max_cost:
+        return array('l', [min_cost]) * num_edge
+    return array('l', [rng.randint(min_cost, max_cost) for i in range(num_edge)])
+
+
+def generate_circle(num_node):
+    sources, targets, costs = new_edge_arrays()
+    for i in range(num_node):
+        sources.append(i)
+        targets.append((i + 1) % num_node)
+    return num_node, sources, targets
+
+
+def generate_full(num_node):
+    sources, targets, costs = new_edge_arrays()
+    for i in range(num_node):
+        others = range(i + 1, num_node)
+        sources.extend(array('l', [i]) * len(others))
+        targets.extend(others)
+    return num_node, sources, targets
+
+
+def generate_grid(rows, columns, wrap=False):
+    """
+    Generate a grid, or a torus when the borders wrap around
+    :param rows: the number of rows
+    :param columns: the number of columns
+    :param wrap: True to link the last row and column to the first ones
+    :return: the number of nodes, the source and target arrays
+    """
+    sources, targets, costs = new_edge_arrays()
+    for r in range(rows):
+        for c in range(columns):
+            index = r * columns + c
+            if c + 1 < columns or (wrap and columns > 2):
+                sources.append(index)
+                targets.append(r * columns + (c + 1) % columns)
+            if r + 1 < rows or (wrap and rows > 2):
+                sources.append(index)
+                targets.append(((r + 1) % rows) * columns + c)
+    return rows * columns, sources, targets
+
+
+def generate_geometric(num_node, radius, rng):
+    """
+    Generate a random geometric graph: nodes are placed in the unit square
+    and linked when closer than the radius. Points are bucketed in cells of
+    the size of the radius so only the neighbor cells are compared.
+    :param num_node: the number of nodes
+    :param radius: the link radius
+    :param rng: the random.Random object
+    :return: the number of nodes, the source and target arrays
+    """
+    sources, targets, costs = new_edge_arrays()
+    points = [(rng.random(), rng.random()) for i in range(num_node)]
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(i)
+    radius_2 = radius * radius
+    for (cx, cy), cell in cells.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            other = cells.get((cx + dx, cy + dy))
+            if other is None:
+                continue
+            for i in cell:
+                xi, yi = points[i]
+                for j in other:
+                    if other is cell and j <= i:
+                        continue
+                    xj, yj = points[j]
+                    if (xi - xj) ** 2 + (yi - yj) ** 2 <= radius_2:
+                        sources.append(i)
+                        targets.append(j)
+    return num_node, sources, targets
+
+
+def generate_erdos_renyi(num_node, probability, rng):
+    """
+    Generate an Erdos-Renyi graph where each pair of nodes is linked with
+    the given probability. The gaps between links are drawn directly
+    (Batagelj and Brandes) so the time is linear in the number of links.
+    :param num_node: the number of nodes
+    :param probability: the probability of each link
+    :param rng: the random.Random object
+    :return: the number of nodes, the source and target arrays
+    """
+    if probability >= 1:
+        return generate_full(num_node)
+    sources, targets, costs = new_edge_arrays()
+    if probability <= 0:
+        return num_node, sources, targets
+    log_q = math.log(1 - probability)
+    v = 1
+    w = -1
+    while v < num_node:
+        w += 1 + int(math.log(1 - rng.random()) / log_q)
+        while w >= v and v < num_node:
+            w -= v
+            v += 1
+        if v < num_node:
+            sources.append(v)
+            targets.append(w)
+    return num_node, sources, targets
+
+
+def generate_barabasi_albert(num_node, num_link, rng):
+    """
+    Generate a Barabasi-Albert graph: each new node is linked to num_link
+    existing nodes picked with a probability proportional to their degree
+    :param num_node: the number of nodes
+    :param num_link: the number of links of each new node
+    :param rng: the random.Random object
+    :return: the number of nodes, the source and target arrays
+    """
+    sources, targets, costs = new_edge_arrays()
+    num_link = max(1, min(num_link, num_node - 1))
+    # Every node appears in the list once per link it has
+    repeated = []
+    chosen = list(range(num_link))
+    for source in range(num_link, num_node):
+        sources.extend(array('l', [source]) * len(chosen))
+        targets.extend(chosen)
+        repeated.extend(chosen)
+        repeated.extend([source] * len(chosen))
+        chosen = set()
+        while len(chosen) < num_link:
+            chosen.add(repeated[rng.randrange(len(repeated))])
+        chosen = list(chosen)
+    return num_node, sources, targets
+
+
+def generate_fat_tree(ports):
+    """
+    Generate a k-ary fat tree: (k/2)^2 core switches and k pods of k/2
+    aggregation and k/2 edge switches, each edge switch serving k/2 hosts
+    :param ports: the number of ports k of a switch, an even number
+    :return: the number of nodes, the source and target arrays
+    """
+    half = ports // 2
+    num_core = half * half
+    num_switch = num_core + ports * ports
+    sources, targets, costs = new_edge_arrays()
+    for pod in range(ports):
+        first_agg = num_core + pod * ports
+        first_edge = first_agg + half
+        for a in range(half):
+            for c in range(half):
+                sources.append(a * half + c)
+                targets.append(first_agg + a)
+            for e in range(half):
+                sources.append(first_agg + a)
+                targets.append(first_edge + e)
+        for e in range(half):
+            first_host = num_switch + (pod * half + e) * half
+            for h in range(half):
+                sources.append(first_edge + e)
+                targets.append(first_host + h)
+    return num_switch + ports * half * half, sources, targets
+
+
+def generate_wan(num_core, num_region, num_site, rng):
+    """
+    Generate a hierarchical WAN: a ring of core routers with chords, region
+    routers dual homed to two neighbor core routers and a random tree of
+    site routers below each region router
+    :param num_core: the number of core routers
+    :param num_region: the number of region routers
+    :param num_site: the number of site routers of each region
+    :param rng: the random.Random object
+    :return: the number of nodes, the source and target arrays
+    """
+    sources, targets, costs = new_edge_arrays()
+    for c in range(num_core):
+        if num_core > 1 and (num_core > 2 or c == 0):
+            sources.append(c)
+            targets.append((c + 1) % num_core)
+    chords = set()
+    for i in range(num_core // 4):
+        c = rng.randrange(num_core)
+        other = (c + num_core // 2) % num_core
+        chords.add((min(c, other), max(c, other)))
+    for c, other in sorted(chords):
+        sources.append(c)
+        targets.append(other)
+    for r in range(num_region):
+        region = num_core + r
+        homes = {r % num_core, (r + 1) % num_core}
+        for c in homes:
+            sources.append(region)
+            targets.append(c)
+        first_site = num_core + num_region + r * num_site
+        for s in range(num_site):
+            parent = rng.randrange(-1, s)
+            sources.append(first_site + s)
+            targets.append(region if parent < 0 else first_site + parent)
+    return num_core + num_region * (1 + num_site), sources, targets
+
+
+def read_topology(filename):
+    """
+    read the config file and return the topology with integer node indices
     :param filename: the config file
-    :return: the number of nodes and list of edges
+    :return: the number of nodes and the source, target and cost arrays
     """
     parser = ConfigParser()
     try:
         parser.read(filename)
-        num_node = parser.getint('node', 'number')
-    except ConfigParser.Error:
+        option = parser.get('node', 'option', fallback="None")
+        num_node = parser.getint('node', 'number', fallback=0)
+        seed = parser.getint('node', 'seed', fallback=None)
+        min_cost = parser.getint('node', 'min_cost', fallback=1)
+        max_cost = parser.getint('node', 'max_cost', fallback=min_cost)
+    except configparser.Error as e:
+        print(e)
         return None
-    except ValueError:
+    except ValueError as e:
+        print(e)
         return None
 
-    option = None
+    if max_cost < min_cost:
+        print("max_cost must not be lower than min_cost")
+        return None
+    if num_node < 0:
+        print("number must not be negative")
+        return None
+
+    if option in ("None", "Circle", "Full") and not parser.has_option('node', 'number'):
+        print("The number of nodes is missing")
+        return None
+
+    rng = random.Random(seed)
     try:
-        option = parser.get('node', 'option')
-    except ConfigParser.Error as e:
+        if option == "Circle":
+            topology = generate_circle(num_node)
+        elif option == "Full":
+            topology = generate_full(num_node)
+        elif option in ("Grid", "Torus"):
+            columns = parser.getint('node', 'columns', fallback=0)
+            rows = parser.getint('node', 'rows', fallback=0)
+            if rows < 0 or columns < 0:
+                print("rows and columns must not be negative")
+                return None
+            columns = columns or math.isqrt(num_node)
+            rows = rows or max(1, num_node // max(1, columns))
+            topology = generate_grid(rows, columns, option == "Torus")
+        elif option == "Geometric":
+            radius = parser.getfloat('node', 'radius',
+                                     fallback=math.sqrt(2 * math.log(max(num_node, 2)) / max(num_node, 1)))
+            if radius <= 0:
+                print("radius must be greater than 0")
+                return None
+            topology = generate_geometric(num_node, radius, rng)
+        elif option == "Random":
+            probability = parser.getfloat('node', 'probability',
+                                          fallback=2 * math.log(max(num_node, 2)) / max(num_node, 1))
+            topology = generate_erdos_renyi(num_node, probability, rng)
+        elif option == "BarabasiAlbert":
+            topology = generate_barabasi_albert(num_node, parser.getint('node', 'links', fallback=2), rng)
+        elif option == "FatTree":
+            ports = parser.getint('node', 'ports', fallback=4)
+            if ports < 0:
+                print("ports must not be negative")
+                return None
+            topology = generate_fat_tree(ports)
+        elif option == "WAN":
+            num_core = parser.getint('node', 'core', fallback=4)
+            num_region = parser.getint('node', 'regions', fallback=8)
+            num_site = parser.getint('node', 'sites', fallback=4)
+            if num_core < 1:
+                print("core must be at least 1")
+                return None
+            if num_region < 0 or num_site < 0:
+                print("regions and sites must not be negative")
+                return None
+            topology = generate_wan(num_core, num_region, num_site, rng)
+        elif option == "None":
+            sources, targets, costs = new_edge_arrays()
+            for name, value in parser.items('edge'):
+                node_1, node_2 = name.split("_")[:2]
+                sources.append(int(node_1) - 1)
+                targets.append(int(node_2) - 1)
+                costs.append(int(value))
+            return num_node, sources, targets, costs
+        else:
+            print("Unknown option", option)
+            return None
+    except configparser.Error as e:
         print(e)
-        pass
+        return None
     except ValueError as e:
         print(e)
-        pass
-
-    list_edge = []
-    if option == "Circle":
-        for i in range(num_node):
-            value = 1
-            node_1 = str((i % num_node)+1)
-            node_2 = str(((i+1) % num_node)+1)
-            print((node_1, node_2, value))
-            list_edge.append((node_1, node_2, value))
-    elif option == "Full":
-        for i in range(num_node):
-            value = 1
-            node_1 = str((i % num_node)+1)
-            for j in range(i+1, num_node):
-                node_2 = str((j % num_node)+1)
-                print((node_1, node_2, value))
-                list_edge.append((node_1, node_2, value))
-    elif option == "None":
-        try:
-            edges = parser.items('edge')
-            for edge in edges:
-                name, value = edge
-                node_1 = name.split("_")[0]
-                node_2 = name.split("_")[1]
-                print(type(value))
-                list_edge.append((node_1, node_2, value))
-
-        except ConfigParser.Error as e:
-            print(e)
-            return None
+        return None
+
+    num_node, sources, targets = topology
+    return num_node, sources, targets, random_costs(rng, len(sources), min_cost, max_cost)
+
+
+def read_delays(filename, num_edge):
+    """
+    read the delays of the links used by the link state simulation, drawn
+    between min_delay and max_delay of the [node] section (1 by default)
+    :param filename: the config file
+    :param num_edge: the number of links
+    :return: array of delays
+    """
+    parser = ConfigParser()
+    try:
+        parser.read(filename)
+        seed = parser.getint('node', 'seed', fallback=None)
+        min_delay = parser.getint('node', 'min_delay', fallback=1)
+        max_delay = parser.getint('node', 'max_delay', fallback=min_delay)
+    except configparser.Error as e:
+        print(e)
+        return None
+    except ValueError as e:
+        print(e)
+        return None
+    if max_delay < min_delay:
+        print("max_delay must not be lower than min_delay")
+        return None
+    return random_costs(random.Random(seed), num_edge, min_delay, max_delay)
 
+
+def read_areas(filename, num_node):
+    """
+    read the areas of the hierarchical mode from the config file, either
+    listed in an [area] section (name = 1-10, 15) or as a number of areas
+    to compute from the topology (areas = K in the [node] section)
+    :param filename: the config file
+    :param num_node: the number of nodes
+    :return: the number of areas and the area name of each node, None when
+        the areas have to be computed. (0, None) when there is no area
+    """
+    parser = ConfigParser()
+    try:
+        parser.read(filename)
+        if not parser.has_section('area'):
+            return parser.getint('node', 'areas', fallback=0), None
+        assignment = [None] * num_node
+        for name, value in parser.items('area'):
+            for part in value.split(","):
+                first, _, last = part.strip().partition("-")
+                for i in range(int(first), int(last or first) + 1):
+                    if not 1 <= i <= num_node:
+                        raise ValueError("Node {} of area {} does not exist".format(i, name))
+                    assignment[i - 1] = name
+    except configparser.Error as e:
+        print(e)
+        return None
+    except ValueError as e:
+        print(e)
+        return None
+    # The nodes missing from the section form their own area
+    assignment = ["" if area is None else area for area in assignment]
+    return len(set(assignment)), assignment
+
+
+def read_file(filename):
+    """
+    read the config file and return the number of
+    nodes and list of edges
+    :param filename: the config file
+    :return: the number of nodes and list of edges
+    """
+    topology = read_topology(filename)
+    if topology is None:
+        return None
+    num_node, sources, targets, costs = topology
+    list_edge = [(str(i + 1), str(j + 1), value)
+                 for i, j, value in zip(sources, targets, costs)]
     return num_node, list_edge
@@ -0,0 +1,448 @@
+import heapq
+import os
+from collections import deque
+from multiprocessing import Process
+from multiprocessing.connection import Client, Listener
+
+from DVR_module import step_round
+from network import Network
+
+
+def build_adjacency(num_node, list_edge):
+    """
+    Build the adjacency list of the topology
+    :param num_node: the number of nodes
+    :param list_edge: list of (name 1, name 2, cost) tuples
+    :return: list holding the neighbor indices of each node
+    """
+    adjacency = [[] for i in range(num_node)]
+    for name_1, name_2, value in list_edge:
+        index_1 = int(name_1) - 1
+        index_2 = int(name_2) - 1
+        adjacency[index_1].append(index_2)
+        adjacency[index_2].append(index_1)
+    return adjacency
+
+
+def partition_topology(num_node, list_edge, num_parts):
+    """
+    Split the nodes into connected groups of about the same size
+    :param num_node: the number of nodes
+    :param list_edge: list of (name 1, name 2, cost) tuples
+    :param num_parts: the number of groups
+    :return: list holding the group number of each node
+    """
+    return partition_adjacency(build_adjacency(num_node, list_edge), num_parts)
+
+
+def bfs_order(adjacency, start, allowed=None):
+    """
+    List the nodes reached by a breadth first search
+    :param adjacency: list holding the neighbor indices of each node
+    :param start: the index of the first node
+    :param allowed: the set of nodes the search may go through, all by default
+    :return: the list of reached node indices in the order of the search
+    """
+    order = [start]
+    visited = {start}
+    for index in order:
+        for neighbor in adjacency[index]:
+            if neighbor not in visited and (allowed is None or neighbor in allowed):
+                visited.add(neighbor)
+                order.append(neighbor)
+    return order
+
+
+def detached_nodes(adjacency, assignment, index):
+    """
+    List the nodes of the group of a node which are cut off from the
+    largest connected part of the group when the node leaves it. A first
+    search from one of its neighbors in the group stops as soon as every
+    other neighbor in the group is reached, which is the common case.
+    :param adjacency: list holding the neighbor indices of each node
+    :param assignment: list holding the group number of each node
+    :param index: the index of the node
+    :return: the list of detached node indices, empty if the rest of the
+        group stays connected
+    """
+    part = assignment[index]
+    neighbors = [neighbor for neighbor in adjacency[index] if assignment[neighbor] == part]
+    targets = set(neighbors[1:])
+    visited = {index}
+    queue = deque(neighbors[:1])
+    visited.update(queue)
+    while queue and targets:
+        for neighbor in adjacency[queue.popleft()]:
+            if neighbor not in visited and assignment[neighbor] == part:
+                visited.add(neighbor)
+                targets.discard(neighbor)
+                queue.append(neighbor)
+    if not targets:
+        return []
+
+    # The node cuts the group, list each part
+    pieces = []
+    visited = {index}
+    for start in neighbors:
+        if start in visited:
+            continue
+        visited.add(start)
+        piece = [start]
+        for node in piece:
+            for neighbor in adjacency[node]:
+                if neighbor not in visited and assignment[neighbor] == part:
+                    visited.add(neighbor)
+                    piece.append(neighbor)
+        pieces.append(piece)
+    pieces.remove(max(pieces, key=len))
+    return [node for piece in pieces for node in piece]
+
+
+def partition_adjacency(adjacency, num_parts):
+    """
+    Split the nodes into connected groups of about the same size.
+    The seeds of the groups are spread along a breadth first search started
+    from a node at the edge of the topology, then the smallest group always
+    takes the next node of its own breadth first search, so that most links
+    stay inside a group and few distance vectors cross the group boundary.
+    Last, the nodes at the boundary of a group move to a smaller neighbor
+    group, with the parts of their group they would cut off.
+    A connected component too small to get a seed is added whole to the
+    smallest group, which is then not connected.
+    :param adjacency: list holding the neighbor indices of each node
+    :param num_parts: the number of groups
+    :return: list holding the group number of each node
+    """
+    num_node = len(adjacency)
+    if num_node == 0:
+        return []
+    num_parts = max(1, min(num_parts, num_node))
+    assignment = [None] * num_node
+
+    # Connected components, each one listed from a node at its edge
+    components = []
+    for start in range(num_node):
+        if assignment[start] is None:
+            order = bfs_order(adjacency, start)
+            for index in order:
+                assignment[index] = len(components)
+            components.append(bfs_order(adjacency, order[-1]))
+    components.sort(key=len, reverse=True)
+
+    # Seeds of each component in proportion to its size, largest remainders first
+    shares = [len(component) * num_parts / num_node for component in components]
+    num_seeds = [int(share) for share in shares]
+    by_remainder = sorted(range(len(components)), key=lambda i: num_seeds[i] - shares[i])
+    for i in by_remainder[:num_parts - sum(num_seeds)]:
+        num_seeds[i] += 1
+
+    assignment = [None] * num_node
+    sizes = []
+    frontiers = []
+    for component, seeds in zip(components, num_seeds):
+        for i in range(seeds):
+            start = component[i * len(component) // seeds]
+            assignment[start] = len(sizes)
+            sizes.append(1)
+            frontiers.append(deque(adjacency[start]))
+
+    # Grow the smallest group by one node at a time
+    heap = [(1, part) for part in range(num_parts)]
+    while heap:
+        size, part = heapq.heappop(heap)
+        frontier = frontiers[part]
+        while frontier and assignment[frontier[0]] is not None:
+            frontier.popleft()
+        if not frontier:
+            continue
+        index = frontier.popleft()
+        assignment[index] = part
+        sizes[part] += 1
+        frontier.extend(adjacency[index])
+        heapq.heappush(heap, (sizes[part], part))
+
+    for component, seeds in zip(components, num_seeds):
+        if seeds == 0:
+            part = min(range(num_parts), key=sizes.__getitem__)
+            for index in component:
+                assignment[index] = part
+            sizes[part] += len(component)
+
+    # Move boundary nodes to the smallest neighbor group while it makes the
+    # sizes closer. A node whose group would be cut takes the detached parts
+    # of the group with it. Each move lowers the sum of the squared sizes.
+    moved = True
+    while moved:
+        moved = False
+        for index in range(num_node):
+            part = assignment[index]
+            target = min((assignment[neighbor] for neighbor in adjacency[index]),
+                         key=sizes.__getitem__, default=part)
+            if sizes[part] <= sizes[target] + 1:
+                continue
+            moving = [index] + detached_nodes(adjacency, assignment, index)
+            if len(moving) < sizes[part] - sizes[target]:
+                for node in moving:
+                    assignment[node] = target
+                sizes[part] -= len(moving)
+                sizes[target] += len(moving)
+                moved = True
+    return assignment
+
+
+class PartitionWorker:
+    """
+    Run the DVR algorithm for the nodes of one partition.
+    The nodes of other partitions linked to a local node are kept as ghost
+    nodes whose distance vector is received from the coordinator.
+    """
+    def __init__(self, spec):
+        self.part = spec["part"]
+        num_node = spec["num_node"]
+        # Only the local and ghost nodes are built, each one at its index in
+        # the whole network so the tables still hold every destination
+        self.network = Network()
+        self.node_slots = self.network.node_slots
+        self.node_slots.reserve(num_node)
+        for index in spec["nodes"] + spec["ghosts"]:
+            self.network.add_router(index=index)
+        for index_1, index_2, cost in spec["edges"]:
+            self.network.add_link(index_1, index_2, cost)
+        self.local_nodes = [self.node_slots.get(i) for i in spec["nodes"]]
+        self.boundary = set(spec["boundary"])
+        self.ghost_nodes = [self.node_slots.get(i) for i in spec["ghosts"]]
+        for node in self.ghost_nodes:
+            dvr = node.dvr
+            dvr.node_table = [None] * num_node
+            dvr.node_table[node.node_index] = [None] * num_node
+            dvr.learn_table = [None] * num_node
+        self.network.initialize(self.local_nodes)
+
+    def own_vectors(self):
+        """
+        Return the distance vectors of the boundary nodes
+        :return: list of (node index, distance vector, learn table)
+        """
+        dvrs = [self.node_slots.get(i).dvr for i in self.boundary]
+        return [(dvr.node_index, dvr.node_table[dvr.node_index], dvr.learn_table) for dvr in dvrs]
+
+    def apply_updates(self, updates):
+        """
+        Save the distance vectors received for the ghost nodes
+        :param updates: list of (node index, distance vector, learn table)
+        """
+        for index, vector, learn_table in updates:
+            node = self.node_slots.get(index)
+            dvr = node.dvr
+            old_vector = dvr.node_table[index]
+            old_learn_table = dvr.learn_table
+            changed_destinations = {i for i in range(len(vector))
+                                    if vector[i] != old_vector[i]
+                                    or learn_table[i] != old_learn_table[i]}
+            dvr.node_table[index] = vector
+            dvr.learn_table = learn_table
+            for neighbor in node.neighbor_nodes:
+                neighbor.dvr.dirty_destinations.update(changed_destinations)
+
+    def step(self):
+        """
+        Run one iteration over the local nodes
+        :return: the number of changed nodes and the boundary vectors to send
+        """
+        changed_nodes = step_round(self.local_nodes)
+        dvrs = [self.node_slots.get(i).dvr for i in changed_nodes if i in self.boundary]
+        updates = [(dvr.node_index, dvr.node_table[dvr.node_index], dvr.learn_table)
+                   for dvr in dvrs if dvr.changed_destinations]
+        return len(changed_nodes), updates
+
+    def results(self):
+        return {node.node_index: (node.dvr.node_table[node.node_index], node.dvr.learn_table)
+                for node in self.local_nodes}
+
+
+def run_worker(address, authkey):
+    """
+    Entry point of a worker process
+    :param address: the address of the coordinator
+    :param authkey: the key to authenticate with the coordinator
+    """
+    connection = Client(address, authkey=authkey)
+    worker = PartitionWorker(connection.recv())
+    connection.send(("ready", worker.own_vectors()))
+    while True:
+        message = connection.recv()
+        if message[0] == "round":
+            worker.apply_updates(message[1])
+            connection.send(("done",) + worker.step())
+        elif message[0] == "collect":
+            connection.send(("result", worker.results()))
+        elif message[0] == "stop":
+            break
+    connection.close()
+
+
+class Coordinator:
+    """
+    Split the network between several worker processes and run the rounds
+    of the simulation. At the end of each round the workers send the new
+    vectors of their boundary nodes, which are forwarded to the workers
+    holding a ghost copy of those nodes before the next round starts.
+    """
+    # Seconds between two checks that a worker is still alive while waiting
+    POLL_INTERVAL = 1.0
+    # Seconds a worker is given to stop before it is terminated
+    STOP_TIMEOUT = 5.0
+
+    def __init__(self, num_node, list_edge, num_workers, family="AF_INET"):
+        self.num_node = num_node
+        self.list_edge = list_edge
+        self.num_workers = max(1, min(num_workers, num_node))
+        self.family = family
+        self.assignment = partition_topology(num_node, list_edge, self.num_workers)
+        # One worker for each group actually built
+        self.num_workers = max(self.assignment) + 1 if self.assignment else 1
+        self.count = 0
+        self.is_converged = False
+        self.specs = self.build_specs()
+        # Node index -> the partitions holding a ghost copy of it
+        self.subscribers = {}
+        for spec in self.specs:
+            for index in spec["ghosts"]:
+                self.subscribers.setdefault(index, []).append(spec["part"])
+
+    def build_specs(self):
+        """
+        Build the description of each partition sent to its worker
+        :return: list of dictionaries, one for each partition
+        """
+        specs = []
+        for part in range(self.num_workers):
+            specs.append({"part": part, "num_node": self.num_node, "nodes": [],
+                          "edges": [], "boundary": set(), "ghosts": set()})
+        for index, part in enumerate(self.assignment):
+            specs[part]["nodes"].append(index)
+        for name_1, name_2, value in self.list_edge:
+            index_1 = int(name_1) - 1
+            index_2 = int(name_2) - 1
+            part_1 = self.assignment[index_1]
+            part_2 = self.assignment[index_2]
+            edge = (index_1, index_2, int(value))
+            specs[part_1]["edges"].append(edge)
+            if part_1 != part_2:
+                specs[part_2]["edges"].append(edge)
+                specs[part_1]["boundary"].add(index_1)
+                specs[part_1]["ghosts"].add(index_2)
+                specs[part_2]["boundary"].add(index_2)
+                specs[part_2]["ghosts"].add(index_1)
+        for spec in specs:
+            spec["boundary"] = sorted(spec["boundary"])
+            spec["ghosts"] = sorted(spec["ghosts"])
+        return specs
+
+    def route_updates(self, updates):
+        """
+        Group the boundary vectors by the partitions that need them
+        :param updates: list of (node index, distance vector, learn table)
+        :return: list holding the updates to send to each partition
+        """
+        outbox = [[] for i in range(self.num_workers)]
+        for update in updates:
+            for part in self.subscribers.get(update[0], []):
+                outbox[part].append(update)
+        return outbox
+
+    @classmethod
+    def receive(cls, part, connection, process):
+        """
+        Wait for the next message of a worker
+        :param part: the partition of the worker
+        :param connection: the connection to the worker
+        :param process: the worker process
+        :return: the message
+        :raise RuntimeError: if the worker process stopped
+        """
+        while not connection.poll(cls.POLL_INTERVAL):
+            if not process.is_alive() and not connection.poll(0):
+                raise RuntimeError("Worker {} stopped with exit code {}".format(
+                    part, process.exitcode))
+        try:
+            return connection.recv()
+        except EOFError:
+            raise RuntimeError("Worker {} closed its connection".format(part))
+
+    def run(self, max_rounds=100):
+        """
+        Start the workers and run the simulation until it converges
+        :param max_rounds: the maximum number of iterations
+        :return: dictionary node index -> (distance vector, learn table)
+        """
+        authkey = os.urandom(16)
+        if self.family == "AF_UNIX":
+            listener = Listener(family="AF_UNIX", authkey=authkey)
+        else:
+            listener = Listener(("127.0.0.1", 0), family="AF_INET", authkey=authkey)
+        processes = []
+        connections = [None] * self.num_workers
+        try:
+            for part in range(self.num_workers):
+                process = Process(target=run_worker, args=(listener.address, authkey))
+                process.start()
+                processes.append(process)
+                connection = listener.accept()
+                connection.send(self.specs[part])
+                connections[part] = connection
+
+            updates = []
+            for part, connection in enumerate(connections):
+                updates.extend(self.receive(part, connection, processes[part])[1])
+
+            self.count = 0
+            self.is_converged = False
+            while self.count < max_rounds and not self.is_converged:
+                outbox = self.route_updates(updates)
+                for part, connection in enumerate(connections):
+                    connection.send(("round", outbox[part]))
+                # Round barrier: wait for every partition to finish the round
+                num_changed = 0
+                updates = []
+                for part, connection in enumerate(connections):
+                    message = self.receive(part, connection, processes[part])
+                    num_changed += message[1]
+                    updates.extend(message[2])
+                self.count += 1
+                self.is_converged = num_changed == 0
+
+            results = {}
+            for connection in connections:
+                connection.send(("collect",))
+            for part, connection in enumerate(connections):
+                results.update(self.receive(part, connection, processes[part])[1])
+            return results
+        finally:
+            # A stopped worker must not hide the error that ended the run
+            for connection in connections:
+                if connection is not None:
+                    try:
+                        connection.send(("stop",))
+                    except OSError:
+                        pass
+                    connection.close()
+            for process in processes:
+                process.join(self.STOP_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            listener.close()
+
+
+if __name__ == '__main__':
+    import sys
+    from configuration_reader import read_file
+
+    num_node, list_edge = read_file(sys.argv[1])
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    coordinator = Coordinator(num_node, list_edge, num_workers)
+    results = coordinator.run()
+    for index in sorted(results):
+        print(index + 1, results[index][0])
+    print("number of iteration: ", coordinator.count)
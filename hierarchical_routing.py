@@ -0,0 +1,309 @@
+import time
+from array import array
+from collections import deque
+
+from DVR_module import GAUSS_SEIDEL, JACOBI, ORDER_INDEX, SimulationResult, is_reversed_round
+from distributed_simulation import partition_adjacency
+
+# Cost of an unreachable destination in the tables
+UNREACHABLE = 2 ** 62
+
+
+def split_disconnected_areas(num_node, sources, targets, areas):
+    """
+    Split each area into the groups of routers connected by links inside
+    the area, as the routes inside an area only use those links
+    :param num_node: the number of routers
+    :param sources: the source router index of each link
+    :param targets: the target router index of each link
+    :param areas: the area of each router, any hashable value
+    :return: the area of each router, (area, part number) for an area split
+        in several parts
+    """
+    adjacency = [[] for i in range(num_node)]
+    for index_1, index_2 in zip(sources, targets):
+        if areas[index_1] == areas[index_2]:
+            adjacency[index_1].append(index_2)
+            adjacency[index_2].append(index_1)
+    part = [None] * num_node
+    num_parts = {}
+    for start in range(num_node):
+        if part[start] is not None:
+            continue
+        area = areas[start]
+        part[start] = num_parts.get(area, 0)
+        num_parts[area] = part[start] + 1
+        queue = deque([start])
+        while queue:
+            for neighbor in adjacency[queue.popleft()]:
+                if part[neighbor] is None:
+                    part[neighbor] = part[start]
+                    queue.append(neighbor)
+    return [areas[i] if num_parts[areas[i]] == 1 else (areas[i], part[i])
+            for i in range(num_node)]
+
+
+class AreaRouter:
+    """
+    A router of the hierarchical network. It keeps a full route to each
+    router of its own area and a single summarized route to each other
+    area, which leads to the closest border router of that area.
+    """
+    def __init__(self, index, area, local_index):
+        self.index = index
+        self.area = area
+        # Position of the router in the list of routers of its area
+        self.local_index = local_index
+        self.neighbors = [] # List of (AreaRouter, link cost)
+        # Routes to the routers of the area, by local index
+        self.intra_cost = array('q')
+        self.intra_hop = array('l')
+        # Summarized routes to the other areas, by area number, with the
+        # border router where the route enters the area
+        self.inter_cost = array('q')
+        self.inter_hop = array('l')
+        self.inter_entry = array('l')
+        # Destinations changed by a neighbor since the last computation
+        self.dirty_intra = set()
+        self.dirty_inter = set()
+        self.pending_intra = {}
+        self.pending_inter = {}
+        # Tables of the neighbors read by each computation
+        self.intra_neighbors = []
+        self.inter_neighbors = []
+
+    def initialize(self, area_size, num_area):
+        """
+        Ininitalize the tables with the links of the router
+        :param area_size: the number of routers in the area
+        :param num_area: the number of areas
+        """
+        self.intra_cost = array('q', [UNREACHABLE]) * area_size
+        self.intra_hop = array('l', [-1]) * area_size
+        self.inter_cost = array('q', [UNREACHABLE]) * num_area
+        self.inter_hop = array('l', [-1]) * num_area
+        self.inter_entry = array('l', [-1]) * num_area
+        self.dirty_intra = set()
+        self.dirty_inter = set()
+        self.pending_intra = {self.local_index: (0, self.index)}
+        self.pending_inter = {}
+        for node, cost in self.neighbors:
+            if node.area == self.area:
+                if cost < self.pending_intra.get(node.local_index, (UNREACHABLE,))[0]:
+                    self.pending_intra[node.local_index] = (cost, node.index)
+            elif cost < self.pending_inter.get(node.area, (UNREACHABLE,))[0]:
+                self.pending_inter[node.area] = (cost, node.index, node.index)
+
+    def link_neighbor_tables(self):
+        """
+        Keep a reference to the tables of the neighbors, must be called
+        once every router is initialized
+        """
+        self.intra_neighbors = [(node.index, node.intra_cost, node.intra_hop, cost)
+                                for node, cost in self.neighbors if node.area == self.area]
+        self.inter_neighbors = [(node.index, node.area, node.inter_cost, node.inter_hop,
+                                 node.inter_entry, cost) for node, cost in self.neighbors]
+
+    def table_size(self):
+        return len(self.intra_cost) + len(self.inter_cost)
+
+    def calculate_distance_vector(self):
+        """
+        Recompute the destinations changed by a neighbor with the
+        Bellman-Ford equation, a neighbor is not used for a destination it
+        reaches through this router (split horizon)
+        :return: True if a route changed
+        """
+        intra = self.dirty_intra
+        inter = self.dirty_inter
+        self.dirty_intra = set()
+        self.dirty_inter = set()
+        index = self.index
+        intra_cost = self.intra_cost
+        intra_hop = self.intra_hop
+        for d in intra:
+            if d == self.local_index:
+                continue
+            min_value, hop = UNREACHABLE, -1
+            for node_index, node_cost, node_hop, cost in self.intra_neighbors:
+                if node_hop[d] != index:
+                    value = node_cost[d] + cost
+                    if value < min_value:
+                        min_value, hop = value, node_index
+            if min_value >= UNREACHABLE:
+                min_value, hop = UNREACHABLE, -1
+            if min_value != intra_cost[d] or hop != intra_hop[d]:
+                self.pending_intra[d] = (min_value, hop)
+
+        for a in inter:
+            if a == self.area:
+                continue
+            min_value, hop, entry = UNREACHABLE, -1, -1
+            for node_index, node_area, node_cost, node_hop, node_entry, cost in self.inter_neighbors:
+                if node_area == a:
+                    if cost < min_value:
+                        min_value, hop, entry = cost, node_index, node_index
+                elif node_hop[a] != index:
+                    value = node_cost[a] + cost
+                    if value < min_value:
+                        min_value, hop, entry = value, node_index, node_entry[a]
+            if min_value >= UNREACHABLE:
+                min_value, hop, entry = UNREACHABLE, -1, -1
+            if min_value != self.inter_cost[a] or hop != self.inter_hop[a] \
+                    or entry != self.inter_entry[a]:
+                self.pending_inter[a] = (min_value, hop, entry)
+        return bool(self.pending_intra or self.pending_inter)
+
+    def update_distance_vector(self):
+        """
+        Commit the new routes and tell the neighbors which ones changed
+        """
+        for d, (min_value, hop) in self.pending_intra.items():
+            self.intra_cost[d] = min_value
+            self.intra_hop[d] = hop
+        for a, (min_value, hop, entry) in self.pending_inter.items():
+            self.inter_cost[a] = min_value
+            self.inter_hop[a] = hop
+            self.inter_entry[a] = entry
+        for node, cost in self.neighbors:
+            if node.area == self.area:
+                node.dirty_intra.update(self.pending_intra)
+            node.dirty_inter.update(self.pending_inter)
+        self.pending_intra = {}
+        self.pending_inter = {}
+
+
+class HierarchicalNetwork:
+    """
+    The network split into areas. Each router keeps full routes inside its
+    area and one route per other area, so the table size and the work of a
+    round scale with the area size instead of the number of routers.
+    """
+    def __init__(self, num_node, sources, targets, costs, areas):
+        """
+        :param num_node: the number of routers
+        :param sources: the source router index of each link
+        :param targets: the target router index of each link
+        :param costs: the cost of each link
+        :param areas: the area of each router, any hashable value. An area
+            whose routers are not connected inside it is split in parts
+        """
+        areas = split_disconnected_areas(num_node, sources, targets, areas)
+        area_number = {}
+        self.area_members = []
+        self.routers = []
+        for index in range(num_node):
+            area = area_number.setdefault(areas[index], len(area_number))
+            if area == len(self.area_members):
+                self.area_members.append([])
+            self.routers.append(AreaRouter(index, area, len(self.area_members[area])))
+            self.area_members[area].append(index)
+        for index_1, index_2, cost in zip(sources, targets, costs):
+            router_1 = self.routers[index_1]
+            router_2 = self.routers[index_2]
+            router_1.neighbors.append((router_2, cost))
+            router_2.neighbors.append((router_1, cost))
+        for router in self.routers:
+            router.neighbors.sort(key=lambda neighbor: neighbor[0].index)
+        self.count = 0
+        self.result = None
+
+    @classmethod
+    def with_partitioned_areas(cls, num_node, sources, targets, costs, num_area):
+        """
+        Build the network with areas computed from the topology
+        :param num_area: the number of areas
+        :return: the HierarchicalNetwork object
+        """
+        adjacency = [[] for i in range(num_node)]
+        for index_1, index_2 in zip(sources, targets):
+            adjacency[index_1].append(index_2)
+            adjacency[index_2].append(index_1)
+        return cls(num_node, sources, targets, costs, partition_adjacency(adjacency, num_area))
+
+    def initialize(self):
+        num_area = len(self.area_members)
+        for router in self.routers:
+            router.initialize(len(self.area_members[router.area]), num_area)
+        for router in self.routers:
+            router.link_neighbor_tables()
+            router.update_distance_vector()
+        self.count = 0
+
+    def step(self, mode=JACOBI, reverse=False):
+        """
+        Run one iteration
+        :param mode: JACOBI or GAUSS_SEIDEL, see DVR_module.step_round
+        :param reverse: True to go through the routers backward
+        :return: the list of router indices whose routes changed
+        """
+        routers = reversed(self.routers) if reverse else self.routers
+        changed_nodes = []
+        for router in routers:
+            if (router.dirty_intra or router.dirty_inter) and router.calculate_distance_vector():
+                changed_nodes.append(router.index)
+                if mode == GAUSS_SEIDEL:
+                    router.update_distance_vector()
+        if mode != GAUSS_SEIDEL:
+            for index in changed_nodes:
+                self.routers[index].update_distance_vector()
+        self.count += 1
+        return changed_nodes
+
+    def run(self, max_rounds=None, time_budget=None, mode=JACOBI):
+        """
+        Run the simulation until it converges or a budget is exhausted
+        :param max_rounds: the maximum number of iterations, None for no limit
+        :param time_budget: the maximum wall time in seconds, None for no limit
+        :param mode: JACOBI or GAUSS_SEIDEL, Gauss-Seidel rounds go back and
+            forth through the routers
+        :return: True if the network converged
+        """
+        start = time.perf_counter()
+        rounds = 0
+        while True:
+            if max_rounds is not None and rounds >= max_rounds:
+                reason = SimulationResult.ROUND_BUDGET
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                reason = SimulationResult.TIME_BUDGET
+                break
+            # Same schedule as the index order of DVR_module.run_until_stable
+            reverse = is_reversed_round(self.count, ORDER_INDEX)
+            rounds += 1
+            if not self.step(mode, reverse):
+                reason = SimulationResult.CONVERGED
+                break
+        self.result = SimulationResult(rounds, reason, 0, time.perf_counter() - start)
+        return self.result.is_converged
+
+    def route(self, source, destination):
+        """
+        Return the route between two routers. The cost to another area is
+        the summarized cost to its border router plus the cost inside it.
+        :param source: the index of the source router
+        :param destination: the index of the destination router
+        :return: the cost and the index of the next hop, or None, None
+        """
+        router = self.routers[source]
+        target = self.routers[destination]
+        if target.area == router.area:
+            cost = router.intra_cost[target.local_index]
+            hop = router.intra_hop[target.local_index]
+        else:
+            if router.inter_entry[target.area] < 0:
+                return None, None
+            entry = self.routers[router.inter_entry[target.area]]
+            cost = router.inter_cost[target.area] + entry.intra_cost[target.local_index]
+            hop = router.inter_hop[target.area]
+        if cost >= UNREACHABLE:
+            return None, None
+        return cost, hop
+
+    def table_size(self):
+        """
+        Return the average number of entries in the routing tables
+        """
+        if not self.routers:
+            return 0
+        return sum(router.table_size() for router in self.routers) / len(self.routers)
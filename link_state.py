@@ -0,0 +1,380 @@
+import heapq
+import time
+
+
+class LSA:
+    """
+    Link state advertisement: the links of a router at a sequence number.
+    The links are never modified once the LSA is created.
+    """
+    def __init__(self, origin, sequence, links):
+        self.origin = origin
+        self.sequence = sequence
+        self.links = links # Dictionary neighbor index -> link cost
+
+
+class LinkStateRouter:
+    """
+    A router running the link state algorithm. It keeps the newest LSA of
+    each router and a shortest path tree rooted at itself, updated from the
+    links that changed since the last SPF computation.
+    """
+    def __init__(self, graph, node_index, name=None):
+        self.graph = graph
+        self.node_index = node_index
+        self.name = str(node_index + 1) if name is None else str(name)
+        # Neighbor index -> (link cost, link delay)
+        self.neighbors = {}
+        self.sequence = 0
+        self.lsdb = {} # Router index -> newest LSA
+        # Shortest path tree
+        self.cost = []
+        self.parent = []
+        self.next_hop = []
+        self.children = {}
+        # Router index -> its LSA at the last SPF computation, for the
+        # routers whose LSA changed since then
+        self.old_lsas = {}
+        self.is_spf_scheduled = False
+        # Metrics
+        self.cpu_time = 0.0
+        self.spf_runs = 0
+
+    def initialize(self, num_node):
+        """
+        Forget every LSA and route
+        :param num_node: the number of routers
+        """
+        self.cost = [None] * num_node
+        self.parent = [None] * num_node
+        self.next_hop = [None] * num_node
+        self.cost[self.node_index] = 0
+        self.next_hop[self.node_index] = self.node_index
+        self.children = {}
+        self.lsdb = {}
+        self.old_lsas = {}
+        self.is_spf_scheduled = False
+        self.cpu_time = 0.0
+        self.spf_runs = 0
+
+    def originate(self):
+        """
+        Create the LSA describing the current links of the router
+        :return: the LSA object
+        """
+        self.sequence += 1
+        links = {index: cost for index, (cost, delay) in self.neighbors.items()}
+        return LSA(self.node_index, self.sequence, links)
+
+    @staticmethod
+    def link_cost(lsdb, index_1, index_2):
+        """
+        Get the cost of a link from the LSAs, a link is only used when both
+        ends advertise it
+        :param lsdb: dictionary router index -> LSA
+        :return: the cost advertised by index_1, None if the link is not usable
+        """
+        lsa = lsdb.get(index_1)
+        other = lsdb.get(index_2)
+        if lsa is None or other is None or index_1 not in other.links:
+            return None
+        return lsa.links.get(index_2)
+
+    def has_newer(self, lsa):
+        old = self.lsdb.get(lsa.origin)
+        return old is not None and old.sequence >= lsa.sequence
+
+    def install(self, lsa):
+        """
+        Save an LSA if it is newer than the one in the database
+        :param lsa: the LSA object
+        :return: True if the LSA is new and has to be flooded
+        """
+        if self.has_newer(lsa):
+            return False
+        if lsa.origin not in self.old_lsas:
+            self.old_lsas[lsa.origin] = self.lsdb.get(lsa.origin)
+        self.lsdb[lsa.origin] = lsa
+        return True
+
+    def changed_links(self):
+        """
+        Compare the links of the changed LSAs with the ones used by the
+        last SPF computation
+        :return: list of (router, neighbor, old cost, new cost)
+        """
+        lsdb = self.lsdb
+        old_lsas = self.old_lsas
+        self.old_lsas = {}
+        links = set()
+        for origin, old in old_lsas.items():
+            indices = set(lsdb[origin].links)
+            if old is not None:
+                indices.update(old.links)
+            for index in indices:
+                links.add((origin, index))
+                links.add((index, origin))
+        changes = []
+        for index_1, index_2 in links:
+            new_cost = self.link_cost(lsdb, index_1, index_2)
+            # The LSAs used by the last computation
+            lsa = old_lsas[index_1] if index_1 in old_lsas else lsdb.get(index_1)
+            other = old_lsas[index_2] if index_2 in old_lsas else lsdb.get(index_2)
+            if lsa is None or other is None or index_1 not in other.links:
+                old_cost = None
+            else:
+                old_cost = lsa.links.get(index_2)
+            if new_cost != old_cost:
+                changes.append((index_1, index_2, old_cost, new_cost))
+        return changes
+
+    def set_parent(self, index, parent):
+        old_parent = self.parent[index]
+        if old_parent is not None:
+            self.children[old_parent].discard(index)
+        self.parent[index] = parent
+        if parent is None:
+            self.next_hop[index] = None
+            return
+        self.children.setdefault(parent, set()).add(index)
+        self.next_hop[index] = index if parent == self.node_index else self.next_hop[parent]
+
+    def compute_spf(self):
+        """
+        Update the shortest path tree with the links changed since the last
+        computation. The routers below a link that got worse are removed
+        from the tree and reattached from their neighbors, then Dijkstra
+        runs only from those routers and from the links that got better.
+        :return: True if a route changed
+        """
+        changes = self.changed_links()
+        if not changes:
+            return False
+        self.spf_runs += 1
+        cost = self.cost
+        parent = self.parent
+        lsdb = self.lsdb
+
+        invalid = set()
+        for index_1, index_2, old_cost, new_cost in changes:
+            if parent[index_2] == index_1 and (new_cost is None or new_cost > old_cost):
+                stack = [index_2]
+                while stack:
+                    index = stack.pop()
+                    if index not in invalid:
+                        invalid.add(index)
+                        stack.extend(self.children.get(index, ()))
+        for index in invalid:
+            cost[index] = None
+            self.set_parent(index, None)
+
+        heap = []
+        for index in invalid:
+            lsa = lsdb.get(index)
+            for neighbor in lsa.links if lsa is not None else ():
+                link_cost = self.link_cost(lsdb, neighbor, index)
+                if link_cost is not None and cost[neighbor] is not None:
+                    heap.append((cost[neighbor] + link_cost, index, neighbor))
+        for index_1, index_2, old_cost, new_cost in changes:
+            if new_cost is not None and cost[index_1] is not None \
+                    and (cost[index_2] is None or cost[index_1] + new_cost < cost[index_2]):
+                heap.append((cost[index_1] + new_cost, index_2, index_1))
+        heapq.heapify(heap)
+
+        is_changed = bool(invalid)
+        while heap:
+            value, index, from_index = heapq.heappop(heap)
+            if cost[index] is not None and value >= cost[index]:
+                continue
+            cost[index] = value
+            self.set_parent(index, from_index)
+            is_changed = True
+            lsa = lsdb.get(index)
+            if lsa is None:
+                continue
+            for neighbor, link_cost in lsa.links.items():
+                other = lsdb.get(neighbor)
+                if other is None or index not in other.links:
+                    continue
+                new_value = value + link_cost
+                if cost[neighbor] is None or new_value < cost[neighbor]:
+                    heapq.heappush(heap, (new_value, neighbor, index))
+        return is_changed
+
+
+class LinkStateResult:
+    """
+    Outcome of LinkStateNetwork.run
+    """
+    def __init__(self, convergence_time, messages, spf_runs, cpu_times, elapsed):
+        # Simulated time of the last route change
+        self.convergence_time = convergence_time
+        # Number of LSAs sent over the links
+        self.messages = messages
+        self.spf_runs = spf_runs
+        self.cpu_time = sum(cpu_times)
+        self.cpu_per_node = self.cpu_time / len(cpu_times) if cpu_times else 0.0
+        self.max_cpu_per_node = max(cpu_times, default=0.0)
+        self.elapsed = elapsed
+
+
+class LinkStateNetwork:
+    """
+    The network of LinkStateRouter objects. The flooding of the LSAs is
+    simulated with an event queue: an LSA sent over a link arrives after
+    the delay of the link, and a router runs SPF SPF_DELAY after the first
+    new LSA so that the LSAs arriving together are handled at once.
+    """
+    SPF_DELAY = 0
+    # Kinds of events
+    ORIGINATE = 0
+    ARRIVAL = 1
+    SPF = 2
+    EXCHANGE = 3
+
+    def __init__(self, num_node=0):
+        self.node_list = [LinkStateRouter(self, i) for i in range(num_node)]
+        self.events = []
+        self.event_count = 0
+        self.now = 0
+        self.messages = 0
+        self.last_change = 0
+        self.result = None
+
+    @classmethod
+    def from_arrays(cls, num_node, sources, targets, costs, delays=None):
+        """
+        Build the network from the output of configuration_reader.read_topology
+        :param num_node: the number of routers
+        :param sources: the source router index of each link
+        :param targets: the target router index of each link
+        :param costs: the cost of each link
+        :param delays: the delay of each link, 1 by default
+        :return: the LinkStateNetwork object
+        """
+        network = cls(num_node)
+        if delays is None:
+            delays = [1] * len(sources)
+        for index_1, index_2, cost, delay in zip(sources, targets, costs, delays):
+            network.add_link(index_1, index_2, cost, delay)
+        return network
+
+    def push_event(self, delay, kind, index, sender=None, lsa=None):
+        self.event_count += 1
+        heapq.heappush(self.events, (self.now + delay, self.event_count, kind, index, sender, lsa))
+
+    def add_link(self, index_1, index_2, cost, delay=1):
+        self.node_list[index_1].neighbors[index_2] = (cost, delay)
+        self.node_list[index_2].neighbors[index_1] = (cost, delay)
+        self.link_changed(index_1, index_2)
+        # The ends of a new adjacency exchange their whole databases, as
+        # each side may hold LSAs the other one never received
+        if self.node_list[index_1].cost:
+            self.push_event(0, self.EXCHANGE, index_1, index_2)
+            self.push_event(0, self.EXCHANGE, index_2, index_1)
+
+    def remove_link(self, index_1, index_2):
+        del self.node_list[index_1].neighbors[index_2]
+        del self.node_list[index_2].neighbors[index_1]
+        self.link_changed(index_1, index_2)
+
+    def set_link_cost(self, index_1, index_2, cost):
+        for index, other in ((index_1, index_2), (index_2, index_1)):
+            router = self.node_list[index]
+            router.neighbors[other] = (cost, router.neighbors[other][1])
+        self.link_changed(index_1, index_2)
+
+    def link_changed(self, index_1, index_2):
+        """
+        Both ends of a changed link advertise their links again if the
+        simulation is running
+        """
+        if self.node_list[index_1].cost:
+            self.push_event(0, self.ORIGINATE, index_1)
+            self.push_event(0, self.ORIGINATE, index_2)
+
+    def initialize(self):
+        """
+        Clear the databases and let every router flood its first LSA
+        """
+        num_node = len(self.node_list)
+        self.events = []
+        self.now = 0
+        for router in self.node_list:
+            router.initialize(num_node)
+        for router in self.node_list:
+            self.push_event(0, self.ORIGINATE, router.node_index)
+
+    def send_database(self, router, index):
+        """
+        Send every LSA of the router to a neighbor over their link
+        :param router: the LinkStateRouter object
+        :param index: the index of the neighbor
+        """
+        if index not in router.neighbors:
+            return
+        delay = router.neighbors[index][1]
+        neighbor = self.node_list[index]
+        for lsa in router.lsdb.values():
+            self.messages += 1
+            if not neighbor.has_newer(lsa):
+                self.push_event(delay, self.ARRIVAL, index, router.node_index, lsa)
+
+    def flood(self, router, lsa, sender):
+        """
+        Send the LSA to the neighbors except the one it came from. The copy
+        sent to a neighbor which already has it is counted but not queued,
+        as it would be dropped on arrival.
+        """
+        node_list = self.node_list
+        for index, (cost, delay) in router.neighbors.items():
+            if index != sender:
+                self.messages += 1
+                if not node_list[index].has_newer(lsa):
+                    self.push_event(delay, self.ARRIVAL, index, router.node_index, lsa)
+
+    def run(self, max_time=None, time_budget=None):
+        """
+        Process the events until every LSA is flooded and every SPF is done
+        :param max_time: the maximum simulated time, None for no limit
+        :param time_budget: the maximum wall time in seconds, None for no limit
+        :return: True if the network converged
+        """
+        start = time.perf_counter()
+        self.messages = 0
+        self.last_change = self.now
+        spf_runs = sum(router.spf_runs for router in self.node_list)
+        cpu_times = [router.cpu_time for router in self.node_list]
+        node_list = self.node_list
+        events = self.events
+        while events:
+            if max_time is not None and events[0][0] > max_time:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+            self.now, count, kind, index, sender, lsa = heapq.heappop(events)
+            router = node_list[index]
+            if kind == self.ARRIVAL and router.has_newer(lsa):
+                continue
+            cpu_start = time.process_time()
+            if kind == self.SPF:
+                router.is_spf_scheduled = False
+                if router.compute_spf():
+                    self.last_change = self.now
+            elif kind == self.EXCHANGE:
+                self.send_database(router, sender)
+            else:
+                if kind == self.ORIGINATE:
+                    lsa = router.originate()
+                if router.install(lsa):
+                    self.flood(router, lsa, sender)
+                    if not router.is_spf_scheduled:
+                        router.is_spf_scheduled = True
+                        self.push_event(self.SPF_DELAY, self.SPF, index)
+            router.cpu_time += time.process_time() - cpu_start
+        self.result = LinkStateResult(
+            self.last_change, self.messages,
+            sum(router.spf_runs for router in node_list) - spf_runs,
+            [router.cpu_time - cpu for router, cpu in zip(node_list, cpu_times)],
+            time.perf_counter() - start)
+        return not events
@@ -0,0 +1,174 @@
+from DVR_module import DVR, JACOBI, ORDER_INDEX, NodeSlots, is_reversed_round, join_node, leave_node, \
+    run_until_stable, step_round
+
+
+class Router:
+    """
+    Class for a node of the network without any graphical item.
+    It provides the interface the DVR object expects from the GUI Node.
+    """
+    def __init__(self, graph, node_index=None, name=None):
+        self.graph = graph
+        self.node_index = node_index
+        self.name = str(name)
+        self.neighbor_nodes = []
+        # Cost of the link to the neighbor at the same position
+        self.link_costs = []
+
+        # The DVR object
+        self.dvr = DVR(self)
+
+    def add_link(self, node, cost):
+        """
+        Add a link between itself and the node
+        :param node: the Router object on the other end
+        :param cost: int value of the link cost
+        """
+        self.neighbor_nodes.append(node)
+        self.link_costs.append(cost)
+        self.dvr.mark_dirty()
+
+    def remove_link(self, node):
+        index = self.neighbor_nodes.index(node)
+        del self.neighbor_nodes[index]
+        del self.link_costs[index]
+        self.dvr.mark_dirty()
+
+    def get_edge_cost_between(self, node):
+        """
+        Get the cost of the link between itself and the node
+        :param node: the Router object
+        :return: int value of the link cost
+        """
+        if node == self:
+            return 0
+        try:
+            index = self.neighbor_nodes.index(node)
+            return self.link_costs[index]
+        except ValueError:
+            return None
+
+
+class Network:
+    """
+    The network of Router objects, used to run the DVR algorithm
+    without the graphical interface.
+    """
+    def __init__(self, num_node=0):
+        self.node_list = []
+        self.node_slots = NodeSlots()
+        self.node_slots.reserve(num_node)
+        self.count = 0
+        self.result = None
+        for i in range(num_node):
+            self.add_router()
+
+    def add_router(self, name=None, index=None):
+        """
+        Add a router, it takes the lowest free index and joins the
+        simulation if it is running
+        :param name: the name of the router, its index + 1 by default
+        :param index: a free index for the router, the lowest one by default
+        :return: the Router object
+        """
+        router = Router(self)
+        join_node(router, index)
+        router.name = str(router.node_index + 1) if name is None else str(name)
+        return router
+
+    def remove_router(self, router):
+        """
+        Remove a router and its links, only the nodes routing through it
+        have to reconverge
+        :param router: the Router object
+        """
+        for node in list(router.neighbor_nodes):
+            node.remove_link(router)
+            router.remove_link(node)
+        leave_node(router)
+
+    @classmethod
+    def from_edges(cls, num_node, list_edge):
+        """
+        Build the network from the output of configuration_reader.read_file
+        :param num_node: the number of nodes
+        :param list_edge: list of (name 1, name 2, cost) tuples
+        :return: the Network object
+        """
+        network = cls(num_node)
+        for name_1, name_2, value in list_edge:
+            network.add_link(int(name_1) - 1, int(name_2) - 1, int(value))
+        return network
+
+    @classmethod
+    def from_arrays(cls, num_node, sources, targets, costs):
+        """
+        Build the network from the output of configuration_reader.read_topology
+        :param num_node: the number of nodes
+        :param sources: the source node index of each edge
+        :param targets: the target node index of each edge
+        :param costs: the cost of each edge
+        :return: the Network object
+        """
+        network = cls(num_node)
+        for index_1, index_2, cost in zip(sources, targets, costs):
+            network.add_link(index_1, index_2, cost)
+        return network
+
+    def add_link(self, index_1, index_2, cost):
+        node_1 = self.node_slots.get(index_1)
+        node_2 = self.node_slots.get(index_2)
+        node_1.add_link(node_2, cost)
+        node_2.add_link(node_1, cost)
+
+    def remove_link(self, index_1, index_2):
+        node_1 = self.node_slots.get(index_1)
+        node_2 = self.node_slots.get(index_2)
+        node_1.remove_link(node_2)
+        node_2.remove_link(node_1)
+
+    def get_node(self, name):
+        for node in self.node_list:
+            if node.name == name:
+                return node
+        return None
+
+    def initialize(self, node_list=None):
+        """
+        Initialize the DV table of the nodes
+        :param node_list: the nodes to initialize, all of them by default
+        """
+        if node_list is None:
+            self.node_slots.trim()
+            node_list = self.node_list
+        for node in node_list:
+            node.dvr.initialize_node_table()
+        self.count = 0
+
+    def step(self, mode=JACOBI, order=ORDER_INDEX):
+        """
+        Run one iteration
+        :param mode: the update mode, see DVR_module.step_round
+        :param order: the order of the nodes in Gauss-Seidel mode
+        :return: the list of node indices whose distance vector changed
+        """
+        reverse = is_reversed_round(self.count, order)
+        self.count += 1
+        return step_round(self.node_list, mode=mode, order=order, reverse=reverse)
+
+    def run(self, max_rounds=None, time_budget=None, mode=JACOBI, order=ORDER_INDEX,
+            on_round=None):
+        """
+        Run the simulation until it converges or a budget is exhausted
+        :param max_rounds: the maximum number of iterations, None for no limit
+        :param time_budget: the maximum wall time in seconds, None for no limit
+        :param mode: the update mode, see DVR_module.step_round
+        :param order: the order of the nodes in Gauss-Seidel mode
+        :param on_round: function called with the changed node indices of each round
+        :return: True if the network converged
+        """
+        self.result = run_until_stable(self.node_list, max_rounds, time_budget,
+                                       on_round=on_round, mode=mode, order=order,
+                                       first_round=self.count)
+        self.count += self.result.rounds
+        return self.result.is_converged
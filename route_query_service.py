@@ -0,0 +1,237 @@
+import os
+import socket
+import stat
+import socketserver
+import threading
+
+
+class RouteSnapshot:
+    """
+    The routes of every node after a round. The distance vectors and learn
+    tables are replaced and never modified by the DVR objects, so keeping a
+    reference to them is enough to freeze the state of the round.
+    """
+    def __init__(self, node_list, round_number):
+        self.round_number = round_number
+        # Node name -> node index, and node index -> node name
+        self.indices = {}
+        self.names = {}
+        self.vectors = {}
+        self.learn_tables = {}
+        for node in node_list:
+            index = node.node_index
+            self.indices[node.name] = index
+            self.names[index] = node.name
+            self.vectors[index] = node.dvr.node_table[index]
+            self.learn_tables[index] = node.dvr.learn_table
+
+    def route(self, source, destination):
+        """
+        Get the route between two nodes
+        :param source: the name of the source node
+        :param destination: the name of the destination node
+        :return: the cost and the name of the next hop, None if there is no route
+        :raise KeyError: if a node does not exist
+        """
+        source_index = self.indices[source]
+        destination_index = self.indices[destination]
+        cost = self.vectors[source_index][destination_index]
+        next_hop = self.learn_tables[source_index][destination_index]
+        if cost is None or next_hop is None:
+            return None
+        return cost, self.names.get(next_hop)
+
+
+class SnapshotStore:
+    """
+    Hold the latest snapshot. The simulation publishes a new snapshot after
+    each round by replacing the reference, the readers take the reference
+    once per request, so neither side waits for the other.
+    """
+    def __init__(self):
+        self.snapshot = RouteSnapshot([], 0)
+
+    def publish(self, node_list, round_number=None):
+        """
+        Publish the routes of the nodes, must be called between two rounds
+        :param node_list: the list of nodes with initialized DVR objects
+        :param round_number: the number of the round, the next one by default
+        :return: the RouteSnapshot object
+        """
+        if round_number is None:
+            round_number = self.snapshot.round_number + 1
+        snapshot = RouteSnapshot(node_list, round_number)
+        self.snapshot = snapshot
+        return snapshot
+
+
+def parse_address(address):
+    """
+    Parse the address of the service
+    :param address: "host:port" for TCP, a file path for a Unix socket
+    :return: the address family and the address
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in address:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+class RouteQueryHandler(socketserver.BaseRequestHandler):
+    """
+    Answer the queries of a connection, one per line:
+        ROUTE <source> <destination> -> <round> <cost> <next hop>
+                                        or <round> unreachable
+        ROUND -> <round>
+    The client may send many queries before reading the answers, all the
+    queries received in one read are answered from the same snapshot with
+    one write.
+    """
+    def handle(self):
+        store = self.server.store
+        pending = b""
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                break
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+            # The queries of a read are answered from the same round
+            snapshot = store.snapshot
+            # A query which is not valid UTF-8 gets the unknown query answer
+            answers = [self.answer(snapshot, line.decode(errors="replace").split())
+                       for line in lines]
+            self.request.sendall("".join(answers).encode())
+
+    @staticmethod
+    def answer(snapshot, words):
+        """
+        Answer one query from a snapshot
+        :param snapshot: the RouteSnapshot object
+        :param words: the words of the query
+        :return: the answer line
+        """
+        if words == ["ROUND"]:
+            return "{}\n".format(snapshot.round_number)
+        if len(words) == 3 and words[0] == "ROUTE":
+            try:
+                route = snapshot.route(words[1], words[2])
+            except KeyError as e:
+                return "error unknown node {}\n".format(e)
+            if route is None:
+                return "{} unreachable\n".format(snapshot.round_number)
+            return "{} {} {}\n".format(snapshot.round_number, route[0], route[1])
+        return "error unknown query\n"
+
+
+class TCPRouteServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class UnixRouteServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class RouteQueryService:
+    """
+    Serve the routes of the latest snapshot on a local socket in a
+    background thread while the simulation keeps running
+    """
+    def __init__(self, address, store):
+        """
+        :param address: "host:port" for TCP, a file path for a Unix socket
+        :param store: the SnapshotStore object
+        """
+        self.family, self.address = parse_address(address)
+        self.store = store
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """
+        Start the service
+        :return: the address the service listens on
+        :raise FileExistsError: if the Unix socket path is a file which is
+            not a socket
+        """
+        if self.family == socket.AF_UNIX:
+            # Only a socket left by a previous service is replaced
+            if os.path.exists(self.address):
+                if not stat.S_ISSOCK(os.stat(self.address).st_mode):
+                    raise FileExistsError("Not a socket: {}".format(self.address))
+                os.remove(self.address)
+            self.server = UnixRouteServer(self.address, RouteQueryHandler)
+        else:
+            self.server = TCPRouteServer(self.address, RouteQueryHandler)
+        self.server.store = self.store
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.server.server_address
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+        self.server = None
+        self.thread = None
+
+
+class RouteQueryClient:
+    """
+    Query the routes of a RouteQueryService
+    """
+    # Number of queries sent before reading their answers, so that neither
+    # side fills the socket buffers while the other one is writing
+    BATCH = 1000
+
+    def __init__(self, address):
+        """
+        :param address: "host:port" for TCP, a file path for a Unix socket
+        """
+        family, address = parse_address(address)
+        self.connection = socket.socket(family, socket.SOCK_STREAM)
+        self.connection.connect(address)
+        self.reader = self.connection.makefile("rb")
+
+    def routes(self, pairs):
+        """
+        Send the queries together and read the answers
+        :param pairs: list of (source name, destination name)
+        :return: list of (round, cost, next hop name), cost and next hop are
+            None if there is no route
+        :raise KeyError: if a node does not exist, the answers of the batch
+            are read first so the connection can still be used
+        """
+        answers = []
+        for start in range(0, len(pairs), self.BATCH):
+            batch = pairs[start:start + self.BATCH]
+            query = "".join("ROUTE {} {}\n".format(source, destination)
+                            for source, destination in batch)
+            self.connection.sendall(query.encode())
+            lines = [self.reader.readline().decode().split() for i in range(len(batch))]
+            for words in lines:
+                if words[0] == "error":
+                    raise KeyError(" ".join(words[1:]))
+            for words in lines:
+                if words[1] == "unreachable":
+                    answers.append((int(words[0]), None, None))
+                else:
+                    answers.append((int(words[0]), int(words[1]), words[2]))
+        return answers
+
+    def route(self, source, destination):
+        return self.routes([(source, destination)])[0]
+
+    def round_number(self):
+        self.connection.sendall(b"ROUND\n")
+        return int(self.reader.readline())
+
+    def close(self):
+        self.reader.close()
+        self.connection.close()
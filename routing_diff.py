@@ -0,0 +1,172 @@
+from itertools import compress
+from operator import ne, truediv
+
+from route_query_service import RouteSnapshot
+
+
+class RoutingDiff:
+    """
+    The difference between the routes of two states of the network, for
+    example two rounds or the converged states before and after a change.
+    The rows of a node are first compared as whole lists, rows shared
+    between the two states are skipped without being read, and the rows
+    that changed are compared with map and compress so the loops over the
+    entries run in C.
+    """
+    def __init__(self, before, after):
+        """
+        :param before: the RouteSnapshot object of the first state
+        :param after: the RouteSnapshot object of the second state
+        """
+        self.before = before
+        self.after = after
+        self.changed_costs = 0
+        self.changed_next_hops = 0
+        # Source index -> destination indices whose cost or next hop changed
+        self.affected = {}
+        self.lost_routes = 0
+        self.new_routes = 0
+        # Stretch of the routes reachable in both states: new cost / old cost
+        self.stretched_routes = 0
+        self.shrunk_routes = 0
+        self.max_stretch = 1.0
+        self.min_stretch = 1.0
+        self.mean_stretch = 1.0
+        self.added_nodes = sorted(set(after.vectors).difference(before.vectors))
+        self.removed_nodes = sorted(set(before.vectors).difference(after.vectors))
+        self.compare()
+
+    @staticmethod
+    def padded(row, size):
+        if len(row) < size:
+            return row + [None] * (size - len(row))
+        return row
+
+    def compare(self):
+        before = self.before
+        after = self.after
+        total_stretch = 0.0
+        common_routes = 0
+        for source in before.vectors.keys() & after.vectors.keys():
+            old_row = before.vectors[source]
+            new_row = after.vectors[source]
+            old_hops = before.learn_tables[source]
+            new_hops = after.learn_tables[source]
+            size = max(len(old_row), len(new_row))
+            old_row = self.padded(old_row, size)
+            new_row = self.padded(new_row, size)
+            old_hops = self.padded(old_hops, size)
+            new_hops = self.padded(new_hops, size)
+            # The route to the node itself is left out of the stretch
+            reachable = size - new_row.count(None) - 1
+            if (new_row is old_row or new_row == old_row) \
+                    and (new_hops is old_hops or new_hops == old_hops):
+                common_routes += reachable
+                total_stretch += reachable
+                continue
+
+            cost_changes = list(compress(range(size), map(ne, old_row, new_row)))
+            hop_changes = list(compress(range(size), map(ne, old_hops, new_hops)))
+            has_none = reachable + 1 < size or None in old_row
+            if has_none:
+                hop_changes = [i for i in hop_changes if new_row[i] is not None]
+            self.changed_costs += len(cost_changes)
+            self.changed_next_hops += len(hop_changes)
+            if not hop_changes or hop_changes == cost_changes:
+                affected = cost_changes
+            elif not cost_changes:
+                affected = hop_changes
+            else:
+                affected = sorted(set(cost_changes).union(hop_changes))
+            if affected:
+                self.affected[source] = affected
+            if not cost_changes:
+                common_routes += reachable
+                total_stretch += reachable
+                continue
+
+            # The routes whose cost did not change have a stretch of 1
+            common = reachable
+            if has_none:
+                stretches = []
+                for i in cost_changes:
+                    old, new = old_row[i], new_row[i]
+                    if old is None:
+                        self.new_routes += 1
+                        common -= 1
+                    elif new is None:
+                        self.lost_routes += 1
+                    elif old > 0:
+                        stretches.append(new / old)
+            else:
+                old_costs = list(map(old_row.__getitem__, cost_changes))
+                new_costs = list(map(new_row.__getitem__, cost_changes))
+                if 0 in old_costs:
+                    new_costs = [new for old, new in zip(old_costs, new_costs) if old > 0]
+                    old_costs = [old for old in old_costs if old > 0]
+                stretches = list(map(truediv, new_costs, old_costs))
+            if stretches:
+                total_stretch += sum(stretches) - len(stretches)
+                stretched = sum(map((1.0).__lt__, stretches))
+                self.stretched_routes += stretched
+                self.shrunk_routes += len(stretches) - stretched
+                self.max_stretch = max(self.max_stretch, max(stretches))
+                self.min_stretch = min(self.min_stretch, min(stretches))
+            common_routes += common
+            total_stretch += common
+        if common_routes:
+            self.mean_stretch = total_stretch / common_routes
+
+    def affected_pairs(self):
+        """
+        Iterate over the source and destination indices of the routes
+        whose cost or next hop changed
+        """
+        for source, destinations in self.affected.items():
+            for destination in destinations:
+                yield source, destination
+
+    def num_affected_pairs(self):
+        return sum(len(destinations) for destinations in self.affected.values())
+
+    def print_summary(self):
+        print("rounds compared: ", self.before.round_number, self.after.round_number)
+        if self.added_nodes or self.removed_nodes:
+            print("nodes added: ", len(self.added_nodes), "removed: ", len(self.removed_nodes))
+        print("changed costs: ", self.changed_costs)
+        print("changed next hops: ", self.changed_next_hops)
+        print("affected pairs: ", self.num_affected_pairs(),
+              "sources: ", len(self.affected))
+        print("new routes: ", self.new_routes, "lost routes: ", self.lost_routes)
+        print("stretch mean: ", self.mean_stretch, "min: ", self.min_stretch,
+              "max: ", self.max_stretch)
+        print("stretched routes: ", self.stretched_routes,
+              "shorter routes: ", self.shrunk_routes)
+
+
+def diff_node_lists(before, after):
+    """
+    Compare the current routes of two networks
+    :param before: the list of nodes of the first network
+    :param after: the list of nodes of the second network
+    :return: the RoutingDiff object
+    """
+    return RoutingDiff(RouteSnapshot(before, 0), RouteSnapshot(after, 0))
+
+
+if __name__ == '__main__':
+    import sys
+    from configuration_reader import read_topology
+    from network import Network
+
+    networks = []
+    for filename in sys.argv[1:3]:
+        topology = read_topology(filename)
+        if topology is None:
+            print("Cannot read the config file", filename)
+            sys.exit(2)
+        network = Network.from_arrays(*topology)
+        network.initialize()
+        network.run()
+        networks.append(network)
+    diff_node_lists(networks[0].node_list, networks[1].node_list).print_summary()
@@ -0,0 +1,1130 @@
+import math
+from contextlib import contextmanager
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+from DVR_module import *
+import os
+from configuration_reader import read_topology
+from route_query_service import RouteQueryService, RouteSnapshot, SnapshotStore
+from routing_diff import RoutingDiff
+
+
+class Edge(QGraphicsItem):
+    """
+    Class Edge for the edge object
+    """
+    Pi = math.pi
+    TwoPi = 2.0 * Pi
+
+    Type = QGraphicsItem.UserType + 2
+
+    def __init__(self, source_node, dest_node):
+        super(Edge, self).__init__()
+
+        self.setFlag(QGraphicsItem.ItemIsSelectable)
+
+        self.sourcePoint = QPointF()
+        self.destPoint = QPointF()
+
+        self.cost = 1
+        self.is_active = True
+        # Number of distance vector advertisements sent over the edge
+        self.advertisements = 0
+
+        self.penColor = Qt.black
+        self.overlay_color = None
+        self.selectionPolygon = QPolygonF()
+        self.line = QLineF(self.sourcePoint, self.destPoint)
+
+        self.source = source_node
+        self.dest = dest_node
+        self.source.add_edge(self)
+        self.dest.add_edge(self)
+        self.name = "Edge {} - {}".format(source_node.name, dest_node.name)
+        self.adjust()
+
+    def set_cost(self, cost):
+        self.cost = cost
+        self.source.dvr.mark_dirty()
+        self.dest.dvr.mark_dirty()
+
+    def type(self):
+        return Edge.Type
+
+    def source_node(self):
+        return self.source
+
+    def set_source_node(self, node):
+        self.source = node
+        self.adjust()
+
+    def dest_node(self):
+        return self.dest
+
+    def set_dest_node(self, node):
+        self.dest = node
+        self.adjust()
+
+    def set_pen_color(self, color):
+        self.penColor = color
+        self.update()
+
+    def set_overlay_color(self, color):
+        """
+        Set the color drawn by the heatmap overlay, the repaint is left
+        to the caller so that updates can be batched
+        :param color: the QColor or None to draw the normal pen color
+        """
+        self.overlay_color = color
+
+    def adjust(self):
+        if not self.source or not self.dest:
+            return
+
+        self.line = QLineF(self.mapFromItem(self.source, 0, 0),
+                           self.mapFromItem(self.dest, 0, 0))
+
+        self.prepareGeometryChange()
+
+        self.sourcePoint = self.line.p1()
+        self.destPoint = self.line.p2()
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSelectedHasChanged:
+            if self.isSelected():
+                self.set_pen_color(Qt.red)
+            else:
+                self.set_pen_color(Qt.black)
+
+        return super(Edge, self).itemChange(change, value)
+
+    @staticmethod
+    def createSelectionPolygon(line):
+        radAngle = line.angle() * math.pi / 180
+        selectionOffset = 2
+        dx = selectionOffset * math.sin(radAngle)
+        dy = selectionOffset * math.cos(radAngle)
+        offset1 = QPointF(dx, dy)
+        offset2 = QPointF(-dx, -dy)
+        vector = [line.p1() + offset1, line.p1() + offset2,
+                  line.p2() + offset2, line.p2() + offset1]
+        nPolygon = QPolygonF(vector)
+        return nPolygon
+
+    def boundingRect(self):
+        if not self.source or not self.dest:
+            return QRectF()
+
+        extra = 1.0
+
+        return QRectF(self.sourcePoint,
+                      QSizeF(self.destPoint.x() - self.sourcePoint.x(),
+                             self.destPoint.y() - self.sourcePoint.y())).normalized().adjusted(-extra, -extra, extra,
+                                                                                               extra)
+
+    def shape(self):
+        ret = QPainterPath()
+        self.selectionPolygon = self.createSelectionPolygon(self.line)
+        ret.addPolygon(self.selectionPolygon)
+        return ret
+
+    def paint(self, painter, option, widget):
+        if not self.source or not self.dest:
+            return
+
+        if self.line.length() == 0.0:
+            return
+
+        pen = QPen(Qt.black, 1.0, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        if self.overlay_color is not None and not self.isSelected():
+            pen.setColor(self.overlay_color)
+            pen.setWidthF(2.0)
+        else:
+            pen.setColor(self.penColor)
+        painter.setPen(pen)
+        painter.drawLine(self.line)
+
+    def mousePressEvent(self, event):
+        self.update()
+        super(Edge, self).mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self.update()
+        super(Edge, self).mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.source.graph.handle_double_click(self)
+        print("double click edge")
+        self.update()
+        super(Edge, self).mouseDoubleClickEvent(event)
+
+
+class Node(QGraphicsItem):
+    """
+    Class for Node object
+    """
+    Type = QGraphicsItem.UserType + 1
+
+    def __init__(self, graph_widget, name="1"):
+        super(Node, self).__init__()
+
+        self.name = str(name)
+        self.node_index = None
+        self.graph = graph_widget
+        self.newPos = QPointF()
+        self.brush = QBrush(Qt.red)
+        self.overlay_brush = None
+        # Heatmap bucket of the node, None when not colored by the overlay
+        self.heat_bucket = None
+        self.edge_list = []
+        self.neighbor_nodes = []
+
+        # The DVR object
+        self.dvr = DVR(self)
+
+        self.setFlag(QGraphicsItem.ItemIsMovable)
+        self.setFlag(QGraphicsItem.ItemIsSelectable)
+        self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.setZValue(1)
+
+    def get_node_attached(self, edge):
+        """
+        return the node attached to other end of the edge.
+        :param edge: the Edge object
+        :return: a Node object
+        """
+        if edge.source == self:
+            return edge.dest
+        return edge.source
+
+    def type(self):
+        return Node.Type
+
+    def add_edge(self, edge):
+        self.edge_list.append(edge)
+        attached_node = self.get_node_attached(edge)
+        self.neighbor_nodes.append(attached_node)
+        self.dvr.mark_dirty()
+
+    def remove_edge(self, edge):
+        attached_node = self.get_node_attached(edge)
+        self.edge_list.remove(edge)
+        self.neighbor_nodes.remove(attached_node)
+        self.dvr.mark_dirty()
+
+    def get_all_edges(self):
+        return self.edge_list
+
+    def get_edge_cost_between(self, node):
+        """
+        Get the cost of the edge between itself and the node
+        :param node: the Node object
+        :return: int value of the edge cost
+        """
+        if node == self:
+            return 0
+        try:
+            index = self.neighbor_nodes.index(node)
+            return self.edge_list[index].cost
+        except:
+            return None
+
+    def advance(self):
+        if self.newPos == self.pos():
+            return False
+
+        self.setPos(self.newPos)
+        return True
+
+    def boundingRect(self):
+        adjust = 0.5
+        return QRectF(-10 - adjust, -10 - adjust, 23 + adjust, 23 + adjust)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addEllipse(-10, -10, 20, 20)
+        return path
+
+    def set_brush(self, brush):
+        self.brush = brush
+        self.update()
+
+    def set_overlay_brush(self, brush):
+        """
+        Set the brush drawn by the heatmap overlay, the repaint is left
+        to the caller so that updates can be batched
+        :param brush: the QBrush or None to draw the normal brush
+        """
+        self.overlay_brush = brush
+
+    def paint(self, painter, option, widget):
+        if self.overlay_brush is not None and not self.isSelected():
+            painter.setBrush(self.overlay_brush)
+        else:
+            painter.setBrush(self.brush)
+        painter.setPen(QPen(Qt.black, 0))
+        painter.drawEllipse(-10, -10, 20, 20)
+        painter.setPen(QPen(Qt.blue, 0))
+        painter.drawText(QPointF(-5, 5), str(self.name))
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            for edge in self.edge_list:
+                edge.adjust()
+        if change == QGraphicsItem.ItemSelectedHasChanged:
+            if self.isSelected():
+                self.set_brush(QBrush(Qt.black))
+            else:
+                self.set_brush(QBrush(Qt.red))
+
+        return super(Node, self).itemChange(change, value)
+
+    def mousePressEvent(self, event):
+        self.update()
+        super(Node, self).mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self.update()
+        super(Node, self).mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.graph.handle_double_click(self)
+        print("double click")
+        print(self.node_index, self.dvr.node_table)
+        self.update()
+        super(Node, self).mouseDoubleClickEvent(event)
+
+
+class ConvergenceHeatmap:
+    """
+    Overlay coloring Node objects by how recently their distance vector
+    changed and Edge objects by the number of advertisements sent over them.
+    It is driven by the list of changed nodes of each round so the work per
+    round only depends on the recently changed part of the network.
+    """
+    # Node colors from "changed this round" to "changed a while ago"
+    NODE_COLORS = [QColor(255, 255, 0), QColor(255, 170, 0),
+                   QColor(255, 85, 0), QColor(170, 0, 0)]
+    COLD_NODE_COLOR = QColor(70, 110, 200)
+    # Edge colors for advertisement volumes of 1, 2-3, 4-7, 8-15, 16+
+    EDGE_COLORS = [QColor(150, 200, 255), QColor(0, 170, 255),
+                   QColor(0, 200, 0), QColor(255, 140, 0), QColor(220, 0, 0)]
+
+    def __init__(self, graph_widget):
+        self.graph_widget = graph_widget
+        self.enabled = False
+        self.round = 0
+        # Node -> last round its vector changed, only for nodes not cold yet
+        self.active_nodes = {}
+        self.node_brushes = [QBrush(color) for color in self.NODE_COLORS]
+        self.cold_brush = QBrush(self.COLD_NODE_COLOR)
+
+    @staticmethod
+    def age_bucket(age):
+        """
+        Map the number of rounds since the last change to a color bucket
+        :param age: number of rounds since the node vector changed
+        :return: index in NODE_COLORS, or None when the node is cold
+        """
+        if age < 1:
+            return 0
+        if age < 2:
+            return 1
+        if age < 4:
+            return 2
+        if age < 8:
+            return 3
+        return None
+
+    @staticmethod
+    def volume_bucket(advertisements):
+        """
+        Map an advertisement count to a color bucket on a log scale
+        :param advertisements: the number of advertisements over the edge
+        :return: index in EDGE_COLORS, or None when nothing was sent
+        """
+        if advertisements <= 0:
+            return None
+        return min(advertisements.bit_length() - 1,
+                   len(ConvergenceHeatmap.EDGE_COLORS) - 1)
+
+    def set_enabled(self, enabled):
+        """
+        Turn the overlay on or off, repainting every item once
+        :param enabled: True to show the overlay
+        """
+        self.enabled = enabled
+        dirty = []
+        for node in self.graph_widget.node_list:
+            if enabled:
+                node.set_overlay_brush(self.node_brush(node.heat_bucket))
+            else:
+                node.set_overlay_brush(None)
+            dirty.append(node)
+        for edge in self.graph_widget.edge_list:
+            if enabled:
+                bucket = self.volume_bucket(edge.advertisements)
+                edge.set_overlay_color(self.edge_color(bucket))
+            else:
+                edge.set_overlay_color(None)
+            dirty.append(edge)
+        self.flush(dirty)
+
+    def node_brush(self, bucket):
+        if bucket is None:
+            return self.cold_brush
+        return self.node_brushes[bucket]
+
+    def edge_color(self, bucket):
+        if bucket is None:
+            return None
+        return self.EDGE_COLORS[bucket]
+
+    def reset(self):
+        """
+        Forget the history of the previous simulation
+        """
+        self.round = 0
+        self.active_nodes.clear()
+        for node in self.graph_widget.node_list:
+            node.heat_bucket = None
+        for edge in self.graph_widget.edge_list:
+            edge.advertisements = 0
+        if self.enabled:
+            self.set_enabled(True)
+
+    def apply_delta(self, changed_nodes):
+        """
+        Update the overlay with the result of one round.
+        Each changed node advertises its new vector over all its edges.
+        :param changed_nodes: the list of nodes whose vector changed
+        """
+        self.round += 1
+        dirty = []
+        for node in changed_nodes:
+            self.active_nodes[node] = self.round
+            for edge in node.edge_list:
+                old_bucket = self.volume_bucket(edge.advertisements)
+                edge.advertisements += 1
+                bucket = self.volume_bucket(edge.advertisements)
+                if self.enabled and bucket != old_bucket:
+                    edge.set_overlay_color(self.edge_color(bucket))
+                    dirty.append(edge)
+
+        for node, last_round in list(self.active_nodes.items()):
+            bucket = self.age_bucket(self.round - last_round)
+            if bucket is None:
+                del self.active_nodes[node]
+            if bucket != node.heat_bucket:
+                node.heat_bucket = bucket
+                if self.enabled:
+                    node.set_overlay_brush(self.node_brush(bucket))
+                    dirty.append(node)
+        self.flush(dirty)
+
+    def flush(self, dirty):
+        """
+        Schedule a repaint of the items whose colors changed only.
+        Qt merges the invalidated regions into a single repaint of the view.
+        :param dirty: the list of items to repaint
+        """
+        for item in dirty:
+            item.update()
+
+
+class GraphWidget(QGraphicsView):
+    """
+    The customized class to draw Node and Edge object on.
+    """
+    def __init__(self):
+        super(GraphWidget, self).__init__()
+
+        scene = QGraphicsScene(self)
+        # scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        scene.setSceneRect(-200, -200, 400, 400)
+        self.setScene(scene)
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+
+        self.double_selected_item = None
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.node_list = []
+        # Stable index of each node in the DV tables
+        self.node_slots = NodeSlots()
+        self.edge_list = []
+        self.network_graph = []
+        self.heatmap = ConvergenceHeatmap(self)
+
+        node1 = Node(self, 1)
+        node2 = Node(self, 2)
+        node3 = Node(self, 3)
+        node4 = Node(self, 4)
+        self.centerNode = Node(self, 5)
+        node6 = Node(self, 6)
+        node7 = Node(self, 7)
+        node8 = Node(self, 8)
+        node9 = Node(self, 9)
+        self.add_item(node1)
+        self.add_item(node2)
+        self.add_item(node3)
+        # self.add_item(node4)
+        # self.add_item(self.centerNode)
+        # self.add_item(node6)
+        # self.add_item(node7)
+        # self.add_item(node8)
+        # self.add_item(node9)
+        self.add_item(Edge(node1, node3))
+        self.add_item(Edge(node1, node2))
+        self.add_item(Edge(node2, node3))
+        # self.add_item(Edge(node2, self.centerNode))
+        # self.add_item(Edge(node3, node6))
+        # self.add_item(Edge(node4, node1))
+        # self.add_item(Edge(node4, self.centerNode))
+        # self.add_item(Edge(self.centerNode, node6))
+        # self.add_item(Edge(self.centerNode, node8))
+        # self.add_item(Edge(node6, node9))
+        # self.add_item(Edge(node7, node4))
+        # self.add_item(Edge(node8, node7))
+        # self.add_item(Edge(node9, node8))
+
+        node1.setPos(-50, -50)
+        node2.setPos(0, -50)
+        node3.setPos(50, -50)
+        node4.setPos(-50, 0)
+        self.centerNode.setPos(0, 0)
+        node6.setPos(50, 0)
+        node7.setPos(-50, 50)
+        node8.setPos(0, 50)
+        node9.setPos(50, 50)
+
+        self.scale(0.8, 0.8)
+        self.setMinimumSize(400, 400)
+        self.setWindowTitle("Network")
+
+    def add_item(self, item):
+        """
+        Add Node or Edge object to the GraphWidget
+        :param item: Node or Edge object
+        """
+        scene = self.scene()
+        if scene:
+            if type(item) is Node:
+                join_node(item)
+                self.num_nodes += 1
+                item.name = str(item.node_index + 1)
+            elif type(item) is Edge:
+                self.num_edges += 1
+                self.edge_list.append(item)
+            scene.addItem(item)
+
+    @contextmanager
+    def bulk_update(self):
+        """
+        Suspend the scene index and the view updates while many items are
+        added, the scene is indexed and repainted once at the end
+        """
+        scene = self.scene()
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            self.setUpdatesEnabled(True)
+            self.viewport().update()
+
+    def remove_item(self, item):
+        """
+        Remove Node or Edge object from the GraphWidget, the edges of a
+        node are removed with it and its index is freed for the next node
+        :param item: Node or Edge object
+        """
+        scene = self.scene()
+        if type(item) is Node:
+            for edge in list(item.edge_list):
+                self.remove_item(edge)
+            leave_node(item)
+            self.num_nodes -= 1
+            self.heatmap.active_nodes.pop(item, None)
+        elif type(item) is Edge:
+            item.source.remove_edge(item)
+            item.dest.remove_edge(item)
+            self.num_edges -= 1
+            self.edge_list.remove(item)
+        if self.double_selected_item is item:
+            self.double_selected_item = None
+        if scene:
+            scene.removeItem(item)
+
+    def reset(self):
+        """
+        Clear all the item and setting
+        """
+        self.double_selected_item = None
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.node_list.clear()
+        self.node_slots.reset()
+        self.edge_list.clear()
+        self.network_graph.clear()
+        self.heatmap.reset()
+        self.scene().clear()
+
+    def get_node(self, name):
+        """
+        Return the Node object given the name
+        :param name: name of Node object
+        :return: The Node object
+        """
+        for node in self.node_list:
+            if node.name == name:
+                return node
+        return None
+
+    def keyPressEvent(self, event):
+        key = event.key()
+
+        if key == Qt.Key_Up:
+            self.centerNode.moveBy(0, -20)
+        elif key == Qt.Key_Down:
+            self.centerNode.moveBy(0, 20)
+        elif key == Qt.Key_Left:
+            self.centerNode.moveBy(-20, 0)
+        elif key == Qt.Key_Right:
+            self.centerNode.moveBy(20, 0)
+        elif key == Qt.Key_Plus:
+            self.scale_view(1.2)
+        elif key == Qt.Key_Minus:
+            self.scale_view(1 / 1.2)
+        elif key == Qt.Key_Space or key == Qt.Key_Enter:
+            for item in self.scene().items():
+                if isinstance(item, Node):
+                    item.setPos(-240 + qrand() % 480, -240 + qrand() % 480)
+        else:
+            super(GraphWidget, self).keyPressEvent(event)
+
+    def wheelEvent(self, event):
+        self.scale_view(math.pow(2.0, -event.angleDelta().y() / 240.0))
+
+    def scale_view(self, scale_factor):
+        factor = self.transform().scale(scale_factor, scale_factor).mapRect(QRectF(0, 0, 1, 1)).width()
+
+        if factor < 0.07 or factor > 100:
+            return
+
+        self.scale(scale_factor, scale_factor)
+
+    def handle_double_click(self, item):
+        self.double_selected_item = item
+        simulator_object = self.parentWidget().parentWidget()
+        if type(item) == Edge:
+            simulator_object.display(0)
+        elif type(item) == Node:
+            simulator_object.update_table_UI_with_node_table(item)
+            simulator_object.display(1)
+        simulator_object.update()
+
+
+class NetworkSimulator(QWidget):
+    """
+    The class handles the interface for the software
+    """
+    WIDTH = 1200
+    HEIGHT = 600
+    # Number of items added between two updates of the loading progress
+    LOAD_BATCH = 500
+    # Default budgets of Run Simulation, None for no limit
+    MAX_ROUNDS = None
+    TIME_BUDGET = 30.0
+    # Largest budgets the spin boxes accept
+    MAX_ROUNDS_LIMIT = 1000000
+    TIME_BUDGET_LIMIT = 3600.0
+    # Label, update mode and order of the nodes of each round
+    UPDATE_MODES = [("Jacobi", JACOBI, ORDER_INDEX),
+                    ("Gauss-Seidel, index order", GAUSS_SEIDEL, ORDER_INDEX),
+                    ("Gauss-Seidel, BFS order", GAUSS_SEIDEL, ORDER_BFS),
+                    ("Gauss-Seidel, degree order", GAUSS_SEIDEL, ORDER_DEGREE)]
+    # Address of the route query service, host:port or a Unix socket path
+    QUERY_ADDRESS = "127.0.0.1:7878"
+
+    def __init__(self, graph_widget):
+        super().__init__()
+
+        self.block_edit = False
+
+        self.layout = QGridLayout()
+        self.setLayout(self.layout)
+        self.setFixedWidth(self.WIDTH)
+        self.setFixedHeight(self.HEIGHT)
+        self.graph_widget = graph_widget
+        self.scene = self.graph_widget.scene()
+        self.double_selected_item = self.graph_widget.double_selected_item
+        self.count = 0
+        # True when Cancel was clicked during the current run
+        self.is_cancelled = False
+        # Routes of the last round served to other tools
+        self.route_store = SnapshotStore()
+        self.route_service = None
+        # Routes of the last converged run, compared with the next one
+        self.converged_snapshot = None
+        self.createButtons()
+        # self.layout.addWidget(self.graph_widget)
+        self.createSceneWindow()
+        self.create_item_window()
+
+    def create_item_window(self):
+        """
+        Method to create File window (right pannel)
+        """
+        self.file_frame = QGroupBox(self)
+
+        self.stack_node = QWidget()
+        self.stack_edge = QWidget()
+        self.Stack = QStackedWidget()
+        self.Stack.addWidget(self.stack_edge)
+        self.Stack.addWidget(self.stack_node)
+
+        self.stack_node_UI()
+        self.stack_edge_UI()
+
+        layout_file = QVBoxLayout()
+        layout_file.addWidget(self.Stack)
+        self.file_frame.setLayout(layout_file)
+        self.layout.addWidget(self.file_frame, 0, 2)
+
+    def display(self, i):
+        self.Stack.setCurrentIndex(i)
+
+    def stack_node_UI(self):
+        """
+        Method to create node properties view (right most pannel)
+        """
+        layout_node = QVBoxLayout()
+        # --------------------------------------------
+        #               Item name
+        # --------------------------------------------
+        self.item_name_frame = QFrame(self)
+        layout_node_name = QHBoxLayout()
+        self.item_name_frame.setLayout(layout_node_name)
+        name_label = QLabel(self.item_name_frame)
+        name_label.setText("Node Name: ")
+        layout_node_name.addWidget(name_label)
+        self.name_node_widget = QLineEdit(self.item_name_frame)
+        layout_node_name.addWidget(self.name_node_widget)
+        # --------------------------------------------
+        #               Forwarding table
+        # --------------------------------------------
+        self.file_table = QTableWidget(30, 30)
+        self.file_table.setSortingEnabled(False)
+        self.file_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.file_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_table.resizeColumnsToContents()
+        self.file_table.setColumnWidth(5, 0)
+        self.file_table.resizeRowsToContents()
+
+        layout_node.addWidget(self.item_name_frame)
+        layout_node.addWidget(self.file_table)
+        self.stack_node.setLayout(layout_node)
+
+    def stack_edge_UI(self):
+        """
+        Method to create edge properties view (right most pannel)
+        """
+        layout_edge = QGridLayout()
+        name_label = QLabel()
+        name_label.setText("Edge Name: ")
+        self.name_edge_widget = QLineEdit()
+        active_label = QLabel()
+        active_label.setText("Is Active: ")
+        self.active_box = QCheckBox()
+        self.active_box.stateChanged.connect(self.update_edge_active_status)
+        cost_label = QLabel()
+        cost_label.setText("Link Cost: ")
+        # self.cost_edge_widget = QLineEdit()
+        self.cost_edge_widget = QSpinBox()
+        self.cost_edge_widget.setRange(0, 100)
+        self.cost_edge_widget.valueChanged.connect(self.update_edge_cost)
+        layout_edge.addWidget(name_label, 0, 0)
+        layout_edge.addWidget(self.name_edge_widget, 0, 1)
+        layout_edge.addWidget(active_label)
+        layout_edge.addWidget(self.active_box, 1, 1)
+        layout_edge.addWidget(cost_label, 2, 0)
+        layout_edge.addWidget(self.cost_edge_widget, 2, 1)
+
+        self.stack_edge.setLayout(layout_edge)
+
+    def update_table_UI_with_node_table(self, node):
+        node_table = node.dvr.node_table
+        if node_table is []:
+            return
+        self.file_table.setRowCount(len(node_table))
+        self.file_table.setColumnCount(len(node_table))
+        for i in range(len(node_table)):
+            for j, dv in enumerate(node_table[i]):
+                self.file_table.setItem(i, j, QTableWidgetItem("{}".format(dv)))
+
+    def update_edge_cost(self):
+        if type(self.double_selected_item) is Edge:
+            self.double_selected_item.set_cost(self.cost_edge_widget.value())
+            # source_node = self.double_selected_item.source
+            # dest_node = self.double_selected_item.dest
+
+    def update_edge_active_status(self):
+        if type(self.double_selected_item) is Edge:
+            self.double_selected_item.is_active = self.active_box.isChecked()
+
+    def update(self):
+        self.double_selected_item = self.graph_widget.double_selected_item
+        if type(self.double_selected_item) is Node:
+            self.name_node_widget.setText(self.double_selected_item.name)
+        elif type(self.double_selected_item) is Edge:
+            self.name_edge_widget.setText(self.double_selected_item.name)
+            self.cost_edge_widget.setValue(self.double_selected_item.cost)
+            self.active_box.setChecked(self.double_selected_item.is_active)
+        self.iter_widget.setText(str(self.count))
+        super(NetworkSimulator, self).update()
+
+    def reset(self):
+        self.graph_widget.reset()
+        self.count = 0
+        self.route_store.publish([], 0)
+        self.converged_snapshot = None
+        self.update()
+
+    def config_file(self, filename):
+        """
+        Handle reding config file
+        :param filename: the path to config file
+        """
+        self.reset()
+        topology = read_topology(filename)
+        if topology is None:
+            return
+        num_node, sources, targets, costs = topology
+        total = num_node + len(sources)
+        progress = QProgressDialog("Loading network", "", 0, total, self)
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+
+        node_slots = self.graph_widget.node_slots
+        node_slots.reserve(num_node)
+        with self.graph_widget.bulk_update():
+            for i in range(num_node):
+                self.add_node()
+                if i % self.LOAD_BATCH == 0:
+                    progress.setValue(i)
+            for i, (index_1, index_2, value) in enumerate(zip(sources, targets, costs)):
+                my_edge = Edge(node_slots.get(index_1), node_slots.get(index_2))
+                my_edge.set_cost(value)
+                self.graph_widget.add_item(my_edge)
+                if i % self.LOAD_BATCH == 0:
+                    progress.setValue(num_node + i)
+        progress.setValue(total)
+
+    def read_input_file(self):
+        """
+        Open directory for user to pick a file
+        """
+        path = pickAFile()
+        path = path[0]
+        if path.endswith(".ini"):
+            self.config_file(path)
+
+    def add_node(self):
+        self.graph_widget.add_item(Node(self.graph_widget, 20))
+
+    def delete_selected_node(self):
+        selected_lists = self.scene.selectedItems()
+        for item in selected_lists:
+            if type(item) == Node:
+                self.graph_widget.remove_item(item)
+
+    def delete_selected_edge(self):
+        selected_lists = self.scene.selectedItems()
+        for item in selected_lists:
+            if type(item) == Edge and item.scene() is not None:
+                self.graph_widget.remove_item(item)
+
+    def add_edge(self):
+        selectedLists = self.scene.selectedItems()
+
+        # Currently support for selecting at most two items
+        if len(selectedLists) >= 2:
+            self.graph_widget.add_item(Edge(selectedLists[0], selectedLists[1]))
+        else:
+            pass
+
+    def set_name(self, item, name):
+        # TODO: get the cuttent item, get the name in the box, change it
+        pass
+
+    def generate_graph(self):
+        """
+        Initialize the DV table for each node.
+        """
+        dvList = []
+        for i, node_i in enumerate(self.graph_widget.node_list):
+            dvList.append([])
+            for j, node_j in enumerate(self.graph_widget.node_list):
+                dvList[i].append(node_i.get_edge_cost_between(node_j))
+        self.graph_widget.network_graph = dvList
+        self.graph_widget.node_slots.trim()
+        for node in self.graph_widget.node_list:
+            node.dvr.initialize_node_table()
+        self.graph_widget.heatmap.reset()
+        self.route_store.publish(self.graph_widget.node_list, 0)
+
+    def step(self):
+        """
+        Run one iteration
+        """
+        for node in self.graph_widget.node_list:
+            if not node.dvr.is_initialized:
+                print("The dv table of each node must be initialized first")
+                return
+
+        node_list = self.graph_widget.node_list
+        label, mode, order = self.UPDATE_MODES[self.mode_box.currentIndex()]
+        changed_nodes = step_round(node_list, compute_infinity_cost(node_list), mode, order,
+                                   is_reversed_round(self.count, order))
+        self.count += 1
+        self.update()
+        self.show_round(changed_nodes)
+        is_converged = not changed_nodes
+        print(is_converged)
+        return is_converged
+
+    def show_round(self, changed_nodes):
+        node_slots = self.graph_widget.node_slots
+        # Only the nodes whose own vector changed advertise it, the others
+        # only updated their copy of a neighbor vector
+        nodes = [node_slots.get(i) for i in changed_nodes]
+        self.graph_widget.heatmap.apply_delta([node for node in nodes
+                                               if node.dvr.changed_destinations])
+        self.route_store.publish(self.graph_widget.node_list)
+
+    def show_running_round(self, changed_nodes):
+        """
+        Show a round of Run Simulation and handle the events of the
+        interface, so the run can be watched and cancelled
+        :param changed_nodes: the indices of the nodes changed in the round
+        :return: True if the run is cancelled
+        """
+        self.count += 1
+        self.iter_widget.setText(str(self.count))
+        self.show_round(changed_nodes)
+        QApplication.processEvents()
+        return self.is_cancelled
+
+    def cancel_simulation(self):
+        self.is_cancelled = True
+
+    def set_running(self, is_running):
+        """
+        Enable the Cancel button during a run and the other tools otherwise
+        :param is_running: True when a run starts
+        """
+        self.generate_network_graph.setEnabled(not is_running)
+        self.start_simu_button.setEnabled(not is_running)
+        self.step_simu_button.setEnabled(not is_running)
+        self.buttonFrame.setEnabled(not is_running)
+        self.cancel_simu_button.setEnabled(is_running)
+
+    def run_simulation(self):
+        """
+        Run the simulation
+        """
+        for node in self.graph_widget.node_list:
+            if not node.dvr.is_initialized:
+                print("The dv table of each node must be initialized first")
+                return
+        label, mode, order = self.UPDATE_MODES[self.mode_box.currentIndex()]
+        # 0 in a spin box means no limit
+        max_rounds = self.max_rounds_box.value() or None
+        time_budget = self.time_budget_box.value() or None
+        self.is_cancelled = False
+        self.set_running(True)
+        try:
+            result = run_until_stable(self.graph_widget.node_list, max_rounds, time_budget,
+                                      on_round=self.show_running_round, mode=mode,
+                                      order=order, first_round=self.count)
+        finally:
+            self.set_running(False)
+        self.update()
+        print("number of iteration: ", self.count)
+        print("stopped:", result.reason)
+        if result.unreachable_routes:
+            print("unreachable routes removed: ", result.unreachable_routes)
+        if result.is_converged:
+            snapshot = RouteSnapshot(self.graph_widget.node_list, self.count)
+            if self.converged_snapshot is not None:
+                RoutingDiff(self.converged_snapshot, snapshot).print_summary()
+            self.converged_snapshot = snapshot
+
+    def toggle_route_service(self):
+        """
+        Start or stop serving the routes of each round to other tools
+        """
+        if self.route_box.isChecked():
+            self.route_service = RouteQueryService(self.QUERY_ADDRESS, self.route_store)
+            try:
+                print("serving routes on", self.route_service.start())
+            except OSError as e:
+                print("Cannot serve the routes:", e)
+                self.route_service = None
+                self.route_box.setChecked(False)
+        elif self.route_service is not None:
+            self.route_service.stop()
+            self.route_service = None
+
+    def toggle_heatmap(self):
+        self.graph_widget.heatmap.set_enabled(self.heatmap_box.isChecked())
+
+    def createSceneWindow(self):
+        """
+        Method to create middle view (middle pannel)
+        """
+        self.sceneFrame = QGroupBox(self)
+        layoutScene = QVBoxLayout()
+        self.sceneFrame.setLayout(layoutScene)
+
+        # Add Tool Button
+        self.tool_frame = QFrame(self)
+        layout_tool = QHBoxLayout()
+        self.tool_frame.setLayout(layout_tool)
+
+        self.generate_network_graph = QPushButton("Generate Network", self.buttonFrame)
+        self.generate_network_graph.clicked.connect(self.generate_graph)
+        self.start_simu_button = QPushButton("Run Simulation", self.tool_frame)
+        self.start_simu_button.clicked.connect(self.run_simulation)
+        self.step_simu_button = QPushButton("Step", self.tool_frame)
+        self.step_simu_button.clicked.connect(self.step)
+        layout_tool.addWidget(self.generate_network_graph)
+        layout_tool.addWidget(self.start_simu_button)
+        self.heatmap_box = QCheckBox("Heatmap", self.tool_frame)
+        self.heatmap_box.stateChanged.connect(self.toggle_heatmap)
+        self.mode_box = QComboBox(self.tool_frame)
+        for label, mode, order in self.UPDATE_MODES:
+            self.mode_box.addItem(label)
+        self.cancel_simu_button = QPushButton("Cancel", self.tool_frame)
+        self.cancel_simu_button.clicked.connect(self.cancel_simulation)
+        self.cancel_simu_button.setEnabled(False)
+        # Budgets of Run Simulation, the lowest value means no limit
+        self.max_rounds_box = QSpinBox(self.tool_frame)
+        self.max_rounds_box.setRange(0, self.MAX_ROUNDS_LIMIT)
+        self.max_rounds_box.setPrefix("max rounds: ")
+        self.max_rounds_box.setSpecialValueText("no round limit")
+        self.max_rounds_box.setValue(self.MAX_ROUNDS or 0)
+        self.time_budget_box = QDoubleSpinBox(self.tool_frame)
+        self.time_budget_box.setRange(0, self.TIME_BUDGET_LIMIT)
+        self.time_budget_box.setDecimals(1)
+        self.time_budget_box.setPrefix("time budget: ")
+        self.time_budget_box.setSuffix(" s")
+        self.time_budget_box.setSpecialValueText("no time limit")
+        self.time_budget_box.setValue(self.TIME_BUDGET or 0)
+        layout_tool.addWidget(self.step_simu_button)
+        layout_tool.addWidget(self.cancel_simu_button)
+        layout_tool.addWidget(self.mode_box)
+        layout_tool.addWidget(self.max_rounds_box)
+        layout_tool.addWidget(self.time_budget_box)
+        layout_tool.addWidget(self.heatmap_box)
+        self.route_box = QCheckBox("Route Queries", self.tool_frame)
+        self.route_box.stateChanged.connect(self.toggle_route_service)
+        layout_tool.addWidget(self.route_box)
+
+        # Add iteration label
+        self.iter_frame = QFrame(self)
+        layout_iter = QHBoxLayout()
+        self.iter_frame.setLayout(layout_iter)
+
+        iter_label = QLabel(self.iter_frame)
+        iter_label.setText("number of iterations: ")
+        self.iter_widget = QLineEdit(self.iter_frame)
+        self.iter_widget.setText(str(self.count))
+        layout_iter.addWidget(iter_label)
+        layout_iter.addWidget(self.iter_widget)
+
+        # Add Scene
+        layoutScene.addWidget(self.tool_frame)
+        layoutScene.addWidget(self.iter_frame)
+        layoutScene.addWidget(self.graph_widget)
+        self.layout.addWidget(self.sceneFrame, 0, 1)
+
+    def createButtons(self):
+        """
+        Create Button layouts (left pannel)
+        """
+        self.buttonFrame = QGroupBox(self)
+        # self.buttonFrame.setFixedSize(200, 4)
+        layoutButton = QVBoxLayout()
+        self.buttonFrame.setLayout(layoutButton)
+        self.add_edge_button = QPushButton("Add Edge", self.buttonFrame)
+        self.add_edge_button.clicked.connect(self.add_edge)
+        self.add_node_button = QPushButton("Add Node", self.buttonFrame)
+        self.add_node_button.clicked.connect(self.add_node)
+        self.deletet_node_button = QPushButton("Delete Selected Node", self.buttonFrame)
+        self.deletet_node_button.clicked.connect(self.delete_selected_node)
+        self.delete_edge_button = QPushButton("Delete Selected Edge", self.buttonFrame)
+        self.delete_edge_button.clicked.connect(self.delete_selected_edge)
+        self.input_button = QPushButton("Input File", self.buttonFrame)
+        self.input_button.clicked.connect(self.read_input_file)
+        self.reset_button = QPushButton("Reset", self.buttonFrame)
+        self.reset_button.clicked.connect(self.reset)
+        # Add button in layout
+        layoutButton.addWidget(self.input_button)
+        layoutButton.addWidget(self.reset_button)
+        layoutButton.addWidget(self.add_edge_button)
+        layoutButton.addWidget(self.add_node_button)
+        layoutButton.addWidget(self.deletet_node_button)
+        layoutButton.addWidget(self.delete_edge_button)
+        self.layout.addWidget(self.buttonFrame, 0, 0)
+
+
+def pickAFile(sdir=None):
+    """
+        Opens a file chooser to let the user pick a file and returns the
+        complete path name as a string.
+
+        :param sdir: the directory that holds the file (optional)
+        :return: the string path to the file chosen in the dialog box
+    """
+
+    if sdir is not None:
+        our_dir = sdir
+    else:
+        our_dir = os.getcwd()
+    ret = QFileDialog.getOpenFileName(directory=our_dir)
+    if ret == '':
+        ret = None
+
+    return ret
+
+
+def main(argv):
+    """
+    Start the graphical interface
+    :param argv: the command line arguments
+    :return: the exit code of the application
+    """
+    app = QApplication(argv)
+    qsrand(QTime(0, 0, 0).secsTo(QTime.currentTime()))
+
+    widget = GraphWidget()
+
+    a = NetworkSimulator(widget)
+    a.show()
+
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main(sys.argv))
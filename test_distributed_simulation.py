@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from configuration_reader import read_file
+from distributed_simulation import Coordinator, PartitionWorker
+from network import Network
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILES = ["test1.ini", "test2.ini", "test3.ini", "test4.ini"]
+
+
+def read_config(filename):
+    return read_file(os.path.join(DIRECTORY, filename))
+
+
+class DistributedSimulationTest(unittest.TestCase):
+    def test_same_tables_as_single_process(self):
+        for filename in CONFIG_FILES:
+            num_node, list_edge = read_config(filename)
+            network = Network.from_edges(num_node, list_edge)
+            network.initialize()
+            self.assertTrue(network.run())
+            for family in ("AF_INET", "AF_UNIX"):
+                for num_workers in (1, 2, 3, 4):
+                    coordinator = Coordinator(num_node, list_edge, num_workers, family)
+                    results = coordinator.run()
+                    message = (filename, family, num_workers)
+                    self.assertTrue(coordinator.is_converged, message)
+                    self.assertEqual(sorted(results), list(range(num_node)), message)
+                    for node in network.node_list:
+                        vector, learn_table = results[node.node_index]
+                        self.assertEqual(vector, node.dvr.node_table[node.node_index], message)
+                        self.assertEqual(learn_table, node.dvr.learn_table, message)
+
+    def test_worker_builds_local_and_ghost_nodes(self):
+        num_node, list_edge = read_config("test2.ini")
+        coordinator = Coordinator(num_node, list_edge, 3)
+        for spec in coordinator.specs:
+            worker = PartitionWorker(spec)
+            self.assertEqual(sorted(node.node_index for node in worker.network.node_list),
+                             sorted(spec["nodes"] + spec["ghosts"]))
+            for node in worker.local_nodes:
+                self.assertEqual(len(node.dvr.node_table[node.node_index]), num_node)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import random
+import unittest
+
+from configuration_reader import generate_barabasi_albert, generate_grid, generate_wan, random_costs
+from hierarchical_routing import HierarchicalNetwork
+from network import Network
+
+
+class HierarchicalRoutingTest(unittest.TestCase):
+    def test_partitioned_area_sizes(self):
+        rng = random.Random(1)
+        for num_node, sources, targets in (generate_wan(8, 40, 20, rng),
+                                           generate_barabasi_albert(2000, 2, rng)):
+            costs = random_costs(rng, len(sources))
+            for num_area in (2, 4):
+                network = HierarchicalNetwork.with_partitioned_areas(
+                    num_node, sources, targets, costs, num_area)
+                sizes = [len(members) for members in network.area_members]
+                self.assertEqual(len(sizes), num_area)
+                self.assertLessEqual(max(sizes), 1.1 * num_node / num_area + 2, sizes)
+
+    def test_single_area_routes(self):
+        num_node, sources, targets = generate_grid(6, 6, True)
+        costs = random_costs(random.Random(2), len(sources), 1, 9)
+        flat = Network.from_arrays(num_node, sources, targets, costs)
+        flat.initialize()
+        flat.run()
+        network = HierarchicalNetwork(num_node, sources, targets, costs, [0] * num_node)
+        network.initialize()
+        self.assertTrue(network.run())
+        for router in flat.node_list:
+            source = router.node_index
+            for destination in range(num_node):
+                self.assertEqual(network.route(source, destination)[0],
+                                 router.dvr.node_table[source][destination])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import heapq
+import random
+import unittest
+
+from link_state import LinkStateNetwork
+
+
+def dijkstra(network, source):
+    """
+    Shortest path costs from the links of the routers
+    """
+    cost = [None] * len(network.node_list)
+    heap = [(0, source)]
+    while heap:
+        value, index = heapq.heappop(heap)
+        if cost[index] is not None:
+            continue
+        cost[index] = value
+        for neighbor, (link_cost, delay) in network.node_list[index].neighbors.items():
+            if cost[neighbor] is None:
+                heapq.heappush(heap, (value + link_cost, neighbor))
+    return cost
+
+
+class LinkStateTest(unittest.TestCase):
+    def assert_shortest_paths(self, network):
+        for router in network.node_list:
+            self.assertEqual(router.cost, dijkstra(network, router.node_index))
+
+    def test_partition_heal(self):
+        network = LinkStateNetwork(5)
+        for index_1, index_2 in ((0, 1), (1, 2), (2, 3), (0, 4)):
+            network.add_link(index_1, index_2, 1)
+        network.initialize()
+        network.run()
+        network.remove_link(1, 2)
+        network.run()
+        network.remove_link(0, 4)
+        network.run()
+        network.add_link(1, 2, 1)
+        network.run()
+        self.assertIsNone(network.node_list[3].cost[4])
+        self.assertIsNone(network.node_list[3].next_hop[4])
+        self.assert_shortest_paths(network)
+
+    def test_random_changes(self):
+        rng = random.Random(1)
+        for topology in range(50):
+            num_node = rng.randint(2, 12)
+            network = LinkStateNetwork(num_node)
+            for i in range(rng.randint(1, 2 * num_node)):
+                index_1, index_2 = rng.sample(range(num_node), 2)
+                if index_2 not in network.node_list[index_1].neighbors:
+                    network.add_link(index_1, index_2, rng.randint(1, 9), rng.randint(1, 3))
+            network.initialize()
+            network.run()
+            self.assert_shortest_paths(network)
+            for change in range(10):
+                index_1, index_2 = rng.sample(range(num_node), 2)
+                if index_2 not in network.node_list[index_1].neighbors:
+                    network.add_link(index_1, index_2, rng.randint(1, 9), rng.randint(1, 3))
+                elif rng.random() < 0.5:
+                    network.remove_link(index_1, index_2)
+                else:
+                    network.set_link_cost(index_1, index_2, rng.randint(1, 9))
+                network.run()
+                self.assert_shortest_paths(network)
+
+
+if __name__ == '__main__':
+    unittest.main()
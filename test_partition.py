@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from configuration_reader import generate_barabasi_albert, generate_erdos_renyi, generate_fat_tree, \
+    generate_grid, generate_wan
+from distributed_simulation import bfs_order, partition_adjacency
+
+
+def build_adjacency(num_node, sources, targets):
+    adjacency = [[] for i in range(num_node)]
+    for index_1, index_2 in zip(sources, targets):
+        adjacency[index_1].append(index_2)
+        adjacency[index_2].append(index_1)
+    return adjacency
+
+
+def topologies():
+    rng = random.Random(1)
+    yield "barabasi-albert", generate_barabasi_albert(2000, 2, rng)
+    yield "wan", generate_wan(8, 40, 20, rng)
+    yield "fat tree", generate_fat_tree(8)
+    yield "erdos-renyi", generate_erdos_renyi(1000, 0.01, rng)
+    yield "torus", generate_grid(30, 30, True)
+
+
+class PartitionTest(unittest.TestCase):
+    def test_balanced_connected_groups(self):
+        for name, (num_node, sources, targets) in topologies():
+            adjacency = build_adjacency(num_node, sources, targets)
+            self.assertEqual(len(bfs_order(adjacency, 0)), num_node, name)
+            for num_parts in (2, 3, 4):
+                assignment = partition_adjacency(adjacency, num_parts)
+                groups = [{i for i in range(num_node) if assignment[i] == part}
+                          for part in range(num_parts)]
+                sizes = [len(group) for group in groups]
+                self.assertEqual(sum(sizes), num_node, name)
+                self.assertLessEqual(max(sizes), 1.1 * num_node / num_parts + 2, (name, sizes))
+                for group in groups:
+                    self.assertEqual(len(bfs_order(adjacency, min(group), group)), len(group),
+                                     (name, num_parts))
+
+    def test_exact_number_of_groups(self):
+        rng = random.Random(2)
+        for topology in range(100):
+            num_node = rng.randint(1, 60)
+            num_node, sources, targets = generate_erdos_renyi(num_node, rng.uniform(0, 0.2), rng)
+            adjacency = build_adjacency(num_node, sources, targets)
+            num_parts = rng.randint(1, 10)
+            assignment = partition_adjacency(adjacency, num_parts)
+            self.assertEqual(sorted(set(assignment)), list(range(min(num_parts, num_node))))
+
+
+if __name__ == '__main__':
+    unittest.main()